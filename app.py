@@ -7,8 +7,9 @@ from textual.reactive import reactive
 from textual.widgets import DirectoryTree, Header, Footer, Static, Input, Button
 from textual.containers import Horizontal, Vertical
 from textual.screen import Screen
+from textual.worker import get_current_worker
 
-from rich.syntax import Syntax
+from rich.console import RenderableType
 from rich.text import Text
 
 from tools.audio_player import AudioPlayer
@@ -17,10 +18,17 @@ from tools.video_thumbnail import VideoThumbnailer
 from tools.pdf_previewer import PDFPreviewer
 from tools.svg_previewer import SVGPreviewer
 from tools.fuzzy_search import FuzzySearchScreen
+from tools.prefetch import Prefetcher
+from tools.preview_cache import PreviewCache
+from tools.thumbnail_cache import ThumbnailCache
+from tools.dir_size import SizeIndex, SizeProgress, progress_text, rich_report
+from tools.dir_table import DirTable
+from tools.copy_engine import CopyEngine, CopyProgress
+from tools.copy_engine import progress_text as copy_progress_text, report_text as copy_report_text
 from utils import LANGUAGE_MAP, register_custom_themes
 from themes import *
 
-from widgets import HideableDirectoryTree
+from widgets import DirectoryTable, HideableDirectoryTree, TextViewer
 from screens import RenameScreen, MoveScreen, DeleteConfirmScreen, NewFolderScreen, CopyScreen
 
 DEFAULT_THEME = ember
@@ -58,6 +66,14 @@ class FileExplorer(App):
     #preview {
       height: auto;
     }
+    #text_view {
+      height: 90%;
+      display: none;
+    }
+    #detail_panel {
+      height: 90%;
+      display: none;
+    }
     #confirm_actions {
       padding-top: 1;
       content-align: center middle;
@@ -83,11 +99,18 @@ class FileExplorer(App):
         ("R",      "rename",        "Rename"),
         ("M",      "move",          "Move To"),
         ("C",      "copy",          "Copy To"),
+        ("X",      "cancel_copy",   "Cancel Copy"),
+        ("d",      "toggle_details", "Details"),
 
         # Preview Bindings
         ("p",      "play_audio",    "Play/Stop Audio"),
+        ("f",      "toggle_follow", "Follow Log"),
+        ("v",      "toggle_filmstrip", "Filmstrip"),
+        ("right_square_bracket", "next_page", "Next Page"),
+        ("left_square_bracket",  "prev_page", "Prev Page"),
         ("+",      "increase_size", "Img Size"),
         ("-",      "decrease_size", "Img Size"),
+        ("c",      "cache_stats",   "Cache Stats"),
 
         # Redundant Bindings
         ("H",      "toggle_hidden", "Show/Hide Hidden"),
@@ -101,21 +124,47 @@ class FileExplorer(App):
     SIZE_STEP_HEIGHT = 10
     MIN_WIDTH       = 20
     MIN_HEIGHT      = 10
+    # Rendered into the Static preview; everything else goes to the text viewer
+    MEDIA_EXTS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.jp2', '.mp4', '.mov',
+                  '.mkv', '.avi', '.webm', '.pdf', '.svg'}
+    # Memory budget for rendered previews kept for instant revisits
+    PREVIEW_CACHE_BYTES = 64 * 1024 * 1024
+    # Frames shown by the video filmstrip (`v`)
+    FILMSTRIP_FRAMES = 4
+    # Siblings on each side of the tree cursor whose previews are warmed ahead
+    PREFETCH_NEIGHBORS = 3
+    # Disk budget for scaled images and extracted text kept across sessions
+    THUMBNAIL_CACHE_BYTES = 256 * 1024 * 1024
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.current_file:   Path | None = None
         self.current_dir:    Path        = Path.home()
         self.file_to_delete: Path | None = None
+        self.preview_line:   int | None  = None
 
         self.player = AudioPlayer()
+        self.thumbnails = ThumbnailCache(max_bytes=self.THUMBNAIL_CACHE_BYTES)
         self.previewer = ImagePreviewer(max_width=self.preview_width,
-                                        max_height=self.preview_height)
+                                        max_height=self.preview_height,
+                                        thumbnails=self.thumbnails)
         self.video_preview = VideoThumbnailer(max_width=self.preview_width,
-                                              max_height=self.preview_height)
-        self.pdf_preview = PDFPreviewer(max_pages=1, max_chars=8000)
+                                              max_height=self.preview_height,
+                                              thumbnails=self.thumbnails)
+        self.pdf_preview = PDFPreviewer(max_chars=8000, thumbnails=self.thumbnails)
+        self.pdf_pages: dict[Path, int] = {}
         self.svg_preview = SVGPreviewer(max_width=self.preview_width,
-                                         max_height=self.preview_height)
+                                         max_height=self.preview_height,
+                                         thumbnails=self.thumbnails)
+        self.preview_cache = PreviewCache(max_bytes=self.PREVIEW_CACHE_BYTES)
+        self.dir_sizes = SizeIndex()
+        self.copier = CopyEngine()
+        self.show_details = False
+        self._preview_generation = 0
+        self._render_lock = threading.Lock()
+        self._render_request: tuple | None = None
+        self._render_running = False
+        self.prefetcher = Prefetcher(self._prefetch_preview, busy=lambda: self._render_running)
         self.last_played:   Path | None = None
         self.LANGUAGE_MAP = LANGUAGE_MAP
 
@@ -123,6 +172,9 @@ class FileExplorer(App):
         register_custom_themes(self)
         self.theme = DEFAULT_THEME.name
 
+    def on_unmount(self) -> None:
+        self.prefetcher.shutdown()
+
     def watch_preview_width(self, new_width: int) -> None:
         self.previewer.max_width = new_width
         self.video_preview.max_width = new_width
@@ -145,11 +197,34 @@ class FileExplorer(App):
         self.preview_height = max(self.MIN_HEIGHT,
                                   self.preview_height - self.SIZE_STEP_HEIGHT)
 
+    def action_toggle_filmstrip(self) -> None:
+        self.video_preview.filmstrip = 0 if self.video_preview.filmstrip else self.FILMSTRIP_FRAMES
+        self._refresh_preview()
+
+    def action_next_page(self) -> None:
+        self._turn_page(1)
+
+    def action_prev_page(self) -> None:
+        self._turn_page(-1)
+
+    def _turn_page(self, step: int) -> None:
+        path = self.current_file
+        if path is None or path.suffix.lower() != '.pdf':
+            return
+        # Known from rendering the current page; opening the PDF here would block the UI
+        count = self.pdf_preview.known_page_count(str(path))
+        page = max(0, self.pdf_pages.get(path, 0) + step)
+        if count:
+            page = min(page, count - 1)
+        if page != self.pdf_pages.get(path, 0):
+            self.pdf_pages[path] = page
+            self._refresh_preview()
+
     async def action_push_search(self) -> None:
         await self.push_screen("fuzzy_search")
 
     def action_play_audio(self) -> None:
-        preview = self.query_one("#preview", Static)
+        preview = self._preview_static()
         if (not self.current_file
             or self.current_file.suffix.lower() not in ('.mp3','.wav','.flac','.ogg')):
             preview.update("No audio file selected or unsupported format.")
@@ -168,51 +243,164 @@ class FileExplorer(App):
             ).start()
             preview.update(f"Playing: {self.current_file.name}\nPress 'p' again to stop.")
 
+    def action_toggle_follow(self) -> None:
+        viewer = self.query_one("#text_view", TextViewer)
+        if not viewer.display or viewer.document is None:
+            return
+        viewer.follow = not viewer.follow
+        state = "Following" if viewer.follow else "Stopped following"
+        self.notify(f"{state} {Path(viewer.document.path).name}")
+
+    def action_cache_stats(self) -> None:
+        self.notify(self.preview_cache.stats(), title="Preview cache")
+
     def _refresh_preview(self) -> None:
         if not self.current_file or not self.current_file.is_file():
             return
 
-        ext = self.current_file.suffix.lower()
-        preview = self.query_one("#preview", Static)
+        path = self.current_file
+        if path.suffix.lower() not in self.MEDIA_EXTS:
+            self._show_text(path)
+            return
+
+        key = self.preview_cache.key(path, *self._preview_settings(path))
+        generation = self._invalidate_preview()
+        renderable = self.preview_cache.get(key)
+        if renderable is not None:
+            self._show_preview(generation, renderable)
+            return
+
+        # Render off the event loop; show a placeholder until it lands
+        self._show_panel("preview")
+        self.query_one("#preview", Static).update(
+            Text(f"Loading preview of {path.name}…", style="dim")
+        )
+        with self._render_lock:
+            self._render_request = (generation, path, key)
+            if self._render_running:
+                return
+            self._render_running = True
+        self.run_worker(self._render_loop, thread=True, group="preview", exit_on_error=False)
+
+    def _invalidate_preview(self) -> int:
+        """Start a new preview generation; results of older renders are dropped."""
+        self._preview_generation += 1
+        return self._preview_generation
+
+    def _render_loop(self) -> None:
+        """
+        Worker thread: render the most recent preview request. Requests that
+        arrive while a render is running replace each other, so holding an
+        arrow key only ever queues the latest file.
+        """
+        while True:
+            with self._render_lock:
+                request, self._render_request = self._render_request, None
+                if request is None:
+                    self._render_running = False
+                    return
+            generation, path, key = request
+            if generation != self._preview_generation:
+                continue
+            # A prefetch of this file may already be half done
+            self.prefetcher.wait(path)
+            renderable = self.preview_cache.get(key) if key in self.preview_cache else None
+            settings = self._preview_settings(path)
+            try:
+                if renderable is None:
+                    renderable = self._render_preview(path)
+                    # Don't file it under the old key if the preview was resized meanwhile
+                    if settings == self._preview_settings(path):
+                        self.preview_cache.put(key, renderable)
+            except Exception as e:
+                renderable = Text(f"Preview failed: {e}", style="red")
+            if generation == self._preview_generation:
+                self.call_from_thread(self._show_preview, generation, renderable)
+
+    def _show_preview(self, generation: int, renderable: RenderableType) -> None:
+        if generation != self._preview_generation:
+            return
+        self._show_panel("preview")
+        self.query_one("#preview", Static).update(renderable)
+
+    def _prefetch_preview(self, path: Path) -> None:
+        """Prefetcher job: render `path` into the preview cache unless it's already there."""
+        settings = self._preview_settings(path)
+        key = self.preview_cache.key(path, *settings)
+        if key is None or key in self.preview_cache:
+            return
+        renderable = self._render_preview(path)
+        if settings == self._preview_settings(path):
+            self.preview_cache.put(key, renderable)
+
+    def _preview_settings(self, path: Path) -> tuple:
+        """Everything besides the file's contents that changes how its media preview looks."""
+        return (self.preview_width, self.preview_height, self.video_preview.filmstrip,
+                self.pdf_pages.get(path, 0))
+
+    def _render_preview(self, path: Path) -> RenderableType:
+        """Build the preview renderable for `path` (uncached). Runs on a worker thread."""
+        ext = path.suffix.lower()
 
-        if ext in ('.png','.jpg','.jpeg','.bmp','.gif'):
+        if ext in ('.png','.jpg','.jpeg','.bmp','.gif','.jp2'):
             try:
-                preview.update(self.previewer.rich_preview(str(self.current_file)))
+                return self.previewer.rich_preview(str(path))
             except:
-                preview.update(self.previewer.ascii_preview(str(self.current_file)))
+                return self.previewer.ascii_preview(str(path))
 
         elif ext in ('.mp4','.mov','.mkv','.avi','.webm'):
             try:
-                preview.update(self.video_preview.rich_preview(str(self.current_file)))
+                return self.video_preview.rich_preview(str(path))
             except:
-                preview.update(self.video_preview.ascii_preview(str(self.current_file)))
+                return self.video_preview.ascii_preview(str(path))
 
         elif ext == '.pdf':
+            page = self.pdf_pages.get(path, 0)
             try:
-                preview.update(self.pdf_preview.rich_preview(str(self.current_file)))
+                return self.pdf_preview.rich_preview(str(path), page)
             except:
-                preview.update(self.pdf_preview.text_preview(str(self.current_file)))
+                return self.pdf_preview.text_preview(str(path), page)
 
         elif ext == '.svg':
             try:
-                preview.update(self.svg_preview.rich_preview(str(self.current_file)))
+                return self.svg_preview.rich_preview(str(path))
             except:
-                preview.update(self.svg_preview.ascii_preview(str(self.current_file)))
+                return self.svg_preview.ascii_preview(str(path))
 
-        elif ext in self.LANGUAGE_MAP:
-            try:
-                code = self.current_file.read_text(encoding="utf-8")
-                syntax = Syntax(code, self.LANGUAGE_MAP[ext], line_numbers=True)
-                preview.update(syntax)
-            except:
-                preview.update("No Preview Available")
+        return "No Preview Available"
 
-        else:
-            try:
-                text = self.current_file.read_text(encoding="utf-8")
-                preview.update(text)
-            except:
-                preview.update("No Preview Available")
+    def _show_text(self, path: Path) -> None:
+        """Page text and code through the lazy viewer instead of reading the whole file."""
+        self._invalidate_preview()
+        viewer = self.query_one("#text_view", TextViewer)
+        try:
+            viewer.load(str(path), self.LANGUAGE_MAP.get(path.suffix.lower()), self.preview_line)
+        except OSError:
+            viewer.close()
+            self._preview_static().update("No Preview Available")
+            return
+        if viewer.document.binary:
+            viewer.close()
+            self._preview_static().update("No Preview Available")
+            return
+        self._show_panel("text")
+
+    def _show_panel(self, panel: str) -> None:
+        """Show one of the "preview" (Static), "text" (viewer) or "details" (table) panels."""
+        viewer = self.query_one("#text_view", TextViewer)
+        if panel != "text" and viewer.document is not None:
+            # Stop following and let go of the file (its fd and mmap window)
+            viewer.follow = False
+            viewer.close()
+        self.query_one("#preview_scroll").display = panel == "preview"
+        viewer.display = panel == "text"
+        self.query_one("#detail_panel").display = panel == "details"
+
+    def _preview_static(self) -> Static:
+        """The Static preview, made visible, with any pending render dropped."""
+        self._invalidate_preview()
+        self._show_panel("preview")
+        return self.query_one("#preview", Static)
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True, time_format="%I:%M %p", name="File Explorer")
@@ -223,6 +411,10 @@ class FileExplorer(App):
             with Vertical(id="preview_panel"):
                 with Vertical(id="preview_scroll"):
                     yield Static("Select a file to preview its contents", id="preview")
+                yield TextViewer(id="text_view")
+                with Vertical(id="detail_panel"):
+                    yield Input(placeholder="Filter names…", id="detail_filter")
+                    yield DirectoryTable(id="detail_view")
                 with Horizontal(id="preview_actions"):
                     yield Button("Rename",   id="rename_btn")
                     yield Button("Move",     id="move_btn")
@@ -257,7 +449,7 @@ class FileExplorer(App):
         if not self.file_to_delete:
             return
         path = self.file_to_delete
-        preview = self.query_one("#preview", Static)
+        preview = self._preview_static()
         try:
             if path.is_file():
                 path.unlink()
@@ -270,8 +462,9 @@ class FileExplorer(App):
 
         self.current_file   = None
         self.file_to_delete = None
+        self.dir_sizes.invalidate(path.parent)
         tree = self.query_one("#tree", HideableDirectoryTree)
-        await tree.reload()
+        await tree.reload_dirs(path.parent)
         preview.update("Deleted. Select a file to preview its contents.")
 
     ## Create Folder ##
@@ -281,7 +474,7 @@ class FileExplorer(App):
     async def create_folder(self, name: str) -> None:
         parent = self.current_dir or Path.home()
         new_path = parent / name
-        preview = self.query_one("#preview", Static)
+        preview = self._preview_static()
         try:
             new_path.mkdir()
         except Exception as e:
@@ -289,7 +482,7 @@ class FileExplorer(App):
         else:
             preview.update(f"[green]Created folder:[/] {new_path}")
             tree = self.query_one("#tree", HideableDirectoryTree)
-            await tree.reload()
+            await tree.reload_dirs(parent)
 
     ## Rename File ##
     async def action_rename(self) -> None:
@@ -304,7 +497,7 @@ class FileExplorer(App):
             
         old_path = target_path
         new_path = old_path.with_name(new_name)
-        preview = self.query_one("#preview", Static)
+        preview = self._preview_static()
         try:
             old_path.rename(new_path)
         except Exception as e:
@@ -319,7 +512,8 @@ class FileExplorer(App):
             self.current_dir = new_path
             
         tree = self.query_one("#tree", HideableDirectoryTree)
-        await tree.reload()
+        await tree.reload_dirs(old_path.parent)
+        tree.select_path(new_path)
         
         if self.current_file:
             self._refresh_preview()
@@ -337,7 +531,7 @@ class FileExplorer(App):
             return
             
         dest = Path(dest_str).expanduser()
-        preview = self.query_one("#preview", Static)
+        preview = self._preview_static()
         if not dest.is_dir():
             preview.update(f"[red]Destination not a directory: {dest}[/]")
             return
@@ -355,8 +549,11 @@ class FileExplorer(App):
         else:  # Was a directory
             self.current_dir = new_path
             
+        self.dir_sizes.invalidate(source_path.parent)
+        self.dir_sizes.invalidate(dest)
         tree = self.query_one("#tree", HideableDirectoryTree)
-        await tree.reload()
+        await tree.reload_dirs(source_path.parent, dest)
+        tree.select_path(new_path)
         
         if self.current_file:
             self._refresh_preview()
@@ -368,7 +565,7 @@ class FileExplorer(App):
         await self.push_screen("copy")
 
     async def copy_file(self, dest_str: str) -> None:
-        preview = self.query_one("#preview", Static)
+        preview = self._preview_static()
 
         # Use current_file if a file is selected, otherwise use current_dir for directory
         source_path = self.current_file if self.current_file else self.current_dir
@@ -387,61 +584,186 @@ class FileExplorer(App):
             return
 
         new_path = dest_path / source_path.name
-        try:
-            if source_path.is_file():
-                shutil.copy2(str(source_path), str(new_path))
-            elif source_path.is_dir():
-                shutil.copytree(str(source_path), str(new_path))
-        except Exception as e:
-            preview.update(f"[red]Copy failed: {e}[/]")
-            return
+        preview.update(Text(f"Copying {source_path.name}…", style="dim"))
+        self._copy_in_background(source_path, new_path, self._preview_generation)
+
+    def _copy_in_background(self, source: Path, new_path: Path, generation: int) -> None:
+        """Copy on a worker thread; progress shows while the preview still belongs to this copy."""
+        def progress(copied: CopyProgress) -> None:
+            if generation == self._preview_generation:
+                self.call_from_thread(self._show_preview, generation,
+                                      copy_progress_text(str(source), str(new_path), copied))
+
+        def run() -> None:
+            worker = get_current_worker()
+            try:
+                report = self.copier.copy(str(source), str(new_path), progress=progress,
+                                          cancelled=lambda: worker.is_cancelled)
+            except Exception as e:
+                result, severity = Text(f"Copy failed: {e}", style="red"), "error"
+            else:
+                if report is None:
+                    result, severity = Text(f"Copy of {source.name} cancelled", style="yellow"), "warning"
+                else:
+                    result, severity = copy_report_text(report), "information"
+            self.call_from_thread(self._copy_finished, generation, new_path, result, severity)
+
+        self.run_worker(run, thread=True, group="copy", exit_on_error=False)
 
+    async def _copy_finished(self, generation: int, new_path: Path, result: Text, severity: str) -> None:
+        self.dir_sizes.invalidate(new_path.parent)
         tree = self.query_one("#tree", HideableDirectoryTree)
-        await tree.reload()
-        preview.update(f"[green]Copied to:[/] {new_path}")
+        await tree.reload_dirs(new_path.parent)
+        if generation == self._preview_generation:
+            self._show_preview(generation, result)
+        else:
+            # The user has moved on; don't take over the preview
+            summary = f"Copied {new_path.name}" if severity == "information" else result.plain
+            self.notify(summary, severity=severity)
+
+    def action_cancel_copy(self) -> None:
+        self.workers.cancel_group(self, "copy")
 
     ## File / Directory Selection ##
     def on_directory_tree_file_selected(self, event) -> None:
         self.current_file = Path(event.path)
         self.current_dir  = self.current_file.parent
+        self.preview_line = None
         self._refresh_preview()
 
+    def on_tree_node_highlighted(self, event) -> None:
+        """Warm previews of the highlighted file and its nearest siblings."""
+        node = event.node
+        siblings = node.parent.children if node.parent else [node]
+        index = siblings.index(node)
+        nearby = [node]
+        for distance in range(1, self.PREFETCH_NEIGHBORS + 1):
+            nearby += siblings[index + distance:index + distance + 1]
+            if index - distance >= 0:
+                nearby.append(siblings[index - distance])
+        self.prefetcher.schedule([n.data.path for n in nearby
+                                  if n.data and n.data.path.suffix.lower() in self.MEDIA_EXTS])
+
     def on_directory_tree_directory_selected(self, event) -> None:
         self.current_file = None
+        self.preview_line = None
         self.current_dir  = Path(event.path)
-        self.query_one("#preview", Static).update(f"[bold]Directory:[/] {self.current_dir}")
+        if self.show_details:
+            self._show_details(self.current_dir)
+            return
+        self._preview_static().update(f"[bold]Directory:[/] {self.current_dir}")
+        self._measure_dir(self.current_dir, self._preview_generation)
+
+    ## Directory Size ##
+    def _measure_dir(self, path: Path, generation: int) -> None:
+        """Size up `path` in the background, showing progress until the report replaces it."""
+        def stale() -> bool:
+            return get_current_worker().is_cancelled or generation != self._preview_generation
+
+        def progress(walked: SizeProgress) -> None:
+            if not stale():
+                self.call_from_thread(self._show_preview, generation, progress_text(str(path), walked))
+
+        def run() -> None:
+            try:
+                report = self.dir_sizes.measure(str(path), progress=progress, cancelled=stale)
+            except OSError as e:
+                renderable = Text(f"Can't measure {path}: {e}", style="red")
+            else:
+                if report is None:
+                    return
+                renderable = rich_report(report)
+            if not stale():
+                self.call_from_thread(self._show_preview, generation, renderable)
+
+        self.run_worker(run, thread=True, group="dir-size", exclusive=True, exit_on_error=False)
+
+    ## Detail View ##
+    def action_toggle_details(self) -> None:
+        # Directories selected while it's on open in the table instead of the size report
+        self.show_details = not self.query_one("#detail_panel").display
+        if self.show_details:
+            self._show_details(self.current_dir)
+            self.query_one("#detail_view", DirectoryTable).focus()
+        else:
+            self._preview_static().update(f"[bold]Directory:[/] {self.current_dir}")
+            self.query_one("#tree", HideableDirectoryTree).focus()
+
+    def _show_details(self, path: Path) -> None:
+        """List `path` in the sortable table; the scan and sort orders are built off the UI thread."""
+        generation = self._invalidate_preview()
+        table = self.query_one("#detail_view", DirectoryTable)
+        table.set_table(None, f"Reading {path}…")
+        self._show_panel("details")
+        show_hidden = self.query_one("#tree", HideableDirectoryTree).show_hidden
+
+        def run() -> None:
+            worker = get_current_worker()
+            stale = lambda: worker.is_cancelled or generation != self._preview_generation
+            dir_table = DirTable.scan(str(path), show_hidden, cancelled=stale)
+            if dir_table is None:
+                if not stale():
+                    self.call_from_thread(table.set_table, None, f"Can't read {path}")
+                return
+            dir_table.prepare(cancelled=stale)
+            if not stale():
+                self.call_from_thread(table.set_table, dir_table)
+
+        self.run_worker(run, thread=True, group="details", exclusive=True, exit_on_error=False)
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "detail_filter":
+            self.query_one("#detail_view", DirectoryTable).set_filter(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "detail_filter":
+            self.query_one("#detail_view", DirectoryTable).focus()
+
+    def on_directory_table_selected(self, event: DirectoryTable.Selected) -> None:
+        if event.is_dir:
+            self.current_file = None
+            self.current_dir  = event.path
+            self._show_details(event.path)
+        else:
+            self.current_file = event.path
+            self.current_dir  = event.path.parent
+            self.preview_line = None
+            self._refresh_preview()
 
     ## Reset Root ##
     async def action_reset_root(self) -> None:
         tree = self.query_one("#tree", HideableDirectoryTree)
         tree.path = Path.home()
         await tree.reload()
-        self.query_one("#preview", Static).update("Select a file to preview its contents")
+        self._preview_static().update("Select a file to preview its contents")
         self.current_file = None
         self.last_played  = None
         self.current_dir  = Path.home()
 
     ## Toggle Hidden ##
-    async def action_toggle_hidden(self) -> None:
+    def action_toggle_hidden(self) -> None:
+        # The tree re-filters its cached listings itself
         tree = self.query_one("#tree", HideableDirectoryTree)
         tree.show_hidden = not tree.show_hidden
-        await tree.reload()
+        if self.query_one("#detail_panel").display:
+            self._show_details(self.current_dir)
 
     ## Jump to Path ##
-    async def jump_to_path(self, path_str: str) -> None:
+    async def jump_to_path(self, path_str: str, line: int | None = None) -> None:
         target_path = Path(path_str)
         if target_path.is_file():
             self.current_file = target_path
             self.current_dir  = target_path.parent
+            self.preview_line = line
             self._refresh_preview()
             try:
                 tree = self.query_one(HideableDirectoryTree)
                 tree.path = target_path.parent
                 await tree.reload()
             except Exception as e:
-                self.query_one("#preview", Static).update(f"[red]Error navigating tree: {e}[/]")
+                self._preview_static().update(f"[red]Error navigating tree: {e}[/]")
         else:
-            self.query_one("#preview", Static).update(f"[red]Path not found or not a file: {path_str}[/]")
+            self._preview_static().update(f"[red]Path not found or not a file: {path_str}[/]")
 
 
 if __name__ == "__main__":
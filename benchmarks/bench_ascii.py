@@ -0,0 +1,80 @@
+"""
+Compare the old per-pixel `getpixel` ASCII-art loop with the shared
+`translate`-based converter used by the image, video and SVG previewers.
+
+    python benchmarks/bench_ascii.py
+    python benchmarks/bench_ascii.py --image photo.jpg --repeat 20
+
+Without --image a synthetic gradient with noise is used. "full" timings
+include the downscale and grayscale conversion; "map" timings start from
+an image already at the target size, isolating the pixel-to-character step.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from tools.ascii_art import DEFAULT_ASCII_CHARS, image_to_ascii
+
+SIZES = ((100, 50), (400, 200))
+
+
+def getpixel_ascii(img: Image.Image, max_width: int, max_height: int,
+                   chars: str = DEFAULT_ASCII_CHARS) -> str:
+    # The loop the previewers used before
+    img = img.convert("L")
+    img.thumbnail((max_width, max_height))
+    output = []
+    for y in range(img.height):
+        row = []
+        for x in range(img.width):
+            pixel = img.getpixel((x, y))
+            row.append(chars[pixel * (len(chars) - 1) // 255])
+        output.append("".join(row))
+    return "\n".join(output)
+
+
+def synthetic_image(width: int = 1600, height: int = 800) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 64)
+    return Image.blend(gradient, noise, 0.3).convert("RGB")
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="benchmark an existing image instead")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    img = Image.open(args.image) if args.image else synthetic_image()
+    img.load()
+    print(f"source image {img.width}x{img.height} {img.mode}")
+    for width, height in SIZES:
+        old_rows = getpixel_ascii(img, width, height).splitlines()
+        new_rows = image_to_ascii(img, width, height).splitlines()
+        assert len(old_rows) == len(new_rows) and len(old_rows[0]) == len(new_rows[0])
+        sized = img.copy()
+        sized.thumbnail((width, height))
+        for label, src in (("full", img), ("map", sized)):
+            old = best_of(lambda: getpixel_ascii(src, width, height), args.repeat)
+            new = best_of(lambda: image_to_ascii(src, width, height), args.repeat)
+            print(f"{width}x{height:<4} {label:4s}  getpixel {old * 1000:8.2f} ms   "
+                  f"translate {new * 1000:8.2f} ms   {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
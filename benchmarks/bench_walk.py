@@ -0,0 +1,88 @@
+"""
+Compare the single-threaded os.walk used by the old search against the
+parallel scandir walker on a synthetic tree.
+
+    python benchmarks/bench_walk.py                 # 1M files (slow to build once)
+    python benchmarks/bench_walk.py --files 100000  # quicker run
+    python benchmarks/bench_walk.py --root /mnt/nfs/some/tree   # existing tree
+
+The synthetic tree is kept under the temp dir and reused between runs.
+Drop the page cache between runs (echo 3 > /proc/sys/vm/drop_caches) to
+measure cold-cache behaviour.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.fs_walker import ParallelWalker
+
+
+def build_tree(root: str, files: int, per_dir: int, fanout: int) -> None:
+    marker = os.path.join(root, ".complete")
+    if os.path.exists(marker):
+        return
+    print(f"Building synthetic tree with {files:,} files under {root} …")
+    n_dirs = max(1, files // per_dir)
+    made = 0
+    for d in range(n_dirs):
+        # Spread directories over a few levels: a/b/c with `fanout` children each
+        parts = []
+        rest = d
+        for _ in range(3):
+            parts.append(f"d{rest % fanout}")
+            rest //= fanout
+        dirpath = os.path.join(root, *parts, f"leaf{d}")
+        os.makedirs(dirpath, exist_ok=True)
+        for f in range(min(per_dir, files - made)):
+            open(os.path.join(dirpath, f"file_{f}.txt"), "w").close()
+        made += per_dir
+    open(marker, "w").close()
+
+
+def bench_os_walk(root: str) -> int:
+    count = 0
+    for _, _, filenames in os.walk(root):
+        count += len(filenames)
+    return count
+
+
+def bench_parallel(root: str, workers: int | None) -> int:
+    count = 0
+    for listing in ParallelWalker(workers=workers, skip_dirs=()).walk(root):
+        count += len(listing.files)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--per-dir", type=int, default=200)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--root", help="benchmark an existing tree instead")
+    args = parser.parse_args()
+
+    root = args.root
+    if root is None:
+        root = os.path.join(tempfile.gettempdir(), f"fileexp-bench-{args.files}")
+        os.makedirs(root, exist_ok=True)
+        build_tree(root, args.files, args.per_dir, args.fanout)
+
+    for name, fn in (("os.walk", lambda: bench_os_walk(root)),
+                     ("parallel", lambda: bench_parallel(root, args.workers))):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            count = fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:10s} {count:>10,} files  best of {args.repeat}: {best:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from PIL import Image
+
+DEFAULT_ASCII_CHARS = "@%#*+=-:. "
+
+
+@lru_cache(maxsize=16)
+def _table(chars: str) -> bytes | dict[int, str]:
+    """256-entry lookup from gray level to character, as used by `translate`."""
+    mapping = [chars[level * (len(chars) - 1) // 255] for level in range(256)]
+    if chars.isascii():
+        return "".join(mapping).encode("ascii")
+    return dict(enumerate(mapping))
+
+
+def image_to_ascii(img: Image.Image, max_width: int, max_height: int,
+                   chars: str = DEFAULT_ASCII_CHARS) -> str:
+    """
+    Render `img` as ASCII art no larger than (max_width x max_height).
+
+    The image is downscaled first and only then reduced to 8-bit grayscale;
+    the raw pixel bytes are mapped to characters in one `translate` call
+    instead of a Python-level `getpixel` per pixel. `img` itself is left
+    untouched.
+    """
+    scale = min(max_width / img.width, max_height / img.height)
+    if scale < 1:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+    gray = img.convert("L")
+    width = gray.width
+    table = _table(chars)
+    if isinstance(table, bytes):
+        data = gray.tobytes().translate(table).decode("ascii")
+    else:
+        data = gray.tobytes().decode("latin-1").translate(table)
+    return "\n".join(data[i:i + width] for i in range(0, len(data), width))
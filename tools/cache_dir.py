@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+
+APP_NAME = "cli-file-explorer"
+
+
+def cache_path(*parts: str) -> Path:
+    """
+    Return (and create) a directory under the XDG cache home,
+    e.g. cache_path("index") -> ~/.cache/cli-file-explorer/index
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    path = Path(base, APP_NAME, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
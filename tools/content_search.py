@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import mmap
+import stat
+import threading
+import contextlib
+import multiprocessing
+from multiprocessing import resource_tracker
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+# Bytes sniffed from the start of a file to decide whether it is binary
+SNIFF_SIZE = 8192
+
+
+class GrepHit(NamedTuple):
+    path: str
+    line: int        # 1-based
+    text: str
+
+
+def is_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+
+def grep_file(path: str, pattern: re.Pattern, literal: bytes | None = None,
+              max_hits: int = 100) -> list[GrepHit]:
+    """
+    Search one file through a memory map. Binary files (NUL in the first
+    block), unreadable files and anything that isn't a regular file (FIFOs,
+    sockets, devices) yield no hits. `literal`, when given, is
+    checked with a plain `find` first so non-matching files are rejected
+    without running the regex.
+    """
+    hits: list[GrepHit] = []
+    try:
+        # Non-blocking, so a FIFO can't hang the open; then only regular files are read
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return hits
+    try:
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            os.close(fd)
+            return hits
+        with open(fd, "rb") as fh:
+            if is_binary(fh.read(SNIFF_SIZE)):
+                return hits
+            try:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file
+                return hits
+    except OSError:
+        return hits
+
+    with mm:
+        if literal is not None and mm.find(literal) == -1:
+            return hits
+        line_no = 1
+        counted_to = 0
+        for match in pattern.finditer(mm):
+            start = match.start()
+            line_start = mm.rfind(b"\n", 0, start) + 1
+            if line_start < counted_to:
+                # Another match on a line we already reported
+                continue
+            line_no += mm[counted_to:line_start].count(b"\n")
+            line_end = mm.find(b"\n", start)
+            if line_end == -1:
+                line_end = len(mm)
+            text = mm[line_start:min(line_end, line_start + 400)]
+            hits.append(GrepHit(path, line_no, text.decode("utf-8", "replace").rstrip("\r")))
+            counted_to = line_end
+            if len(hits) >= max_hits:
+                break
+    return hits
+
+
+def _grep_chunk(paths: list[str], source: bytes, flags: int,
+                literal: bytes | None, max_hits: int) -> list[GrepHit]:
+    # Runs in a pool process; re caches the compiled pattern per process
+    pattern = re.compile(source, flags)
+    hits: list[GrepHit] = []
+    for path in paths:
+        hits.extend(grep_file(path, pattern, literal, max_hits))
+    return hits
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _shared_executor() -> ProcessPoolExecutor:
+    """One process pool for the app's lifetime; spawning per search is too slow."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # The resource tracker hands sys.stderr's fd to its child; Textual
+            # swaps stderr for an object without one while the app runs.
+            if sys.__stderr__ is not None:
+                with contextlib.redirect_stderr(sys.__stderr__):
+                    resource_tracker.ensure_running()
+            # spawn: forking a process that runs UI and worker threads is unsafe
+            ctx = multiprocessing.get_context("spawn")
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=ctx)
+        return _executor
+
+
+def compile_pattern(query: str, regex: bool) -> tuple[bytes, int, bytes | None]:
+    """
+    Turn a user query into (pattern source, flags, literal prefilter).
+    Smart case: the search ignores case unless the query has an uppercase
+    letter. Raises re.error for an invalid regex.
+    """
+    flags = re.MULTILINE
+    if query == query.lower():
+        flags |= re.IGNORECASE
+    raw = query.encode("utf-8", "surrogateescape")
+    source = raw if regex else re.escape(raw)
+    re.compile(source, flags)
+    literal = raw if not regex and not flags & re.IGNORECASE else None
+    return source, flags, literal
+
+
+class ContentSearcher:
+    """
+    Search file contents for a literal or regex across a process pool.
+
+    Paths are sent to the pool in chunks and hits are yielded as chunks
+    complete, together with the number of files scanned so far.
+    """
+
+    def __init__(self, chunk_size: int = 64, max_hits_per_file: int = 100):
+        self.chunk_size = chunk_size
+        self.max_hits_per_file = max_hits_per_file
+
+    def search(self, paths: Iterable[str], query: str, regex: bool = False,
+               cancelled: Callable[[], bool] | None = None) -> Iterator[tuple[int, list[GrepHit]]]:
+        source, flags, literal = compile_pattern(query, regex)
+        pool = _shared_executor()
+        max_inflight = (os.cpu_count() or 1) * 2
+        pending: dict[Future, int] = {}
+        scanned = 0
+        path_iter = iter(paths)
+        exhausted = False
+        try:
+            while not exhausted or pending:
+                if cancelled is not None and cancelled():
+                    return
+                while not exhausted and len(pending) < max_inflight:
+                    chunk = []
+                    for path in path_iter:
+                        chunk.append(path)
+                        if len(chunk) >= self.chunk_size:
+                            break
+                    else:
+                        exhausted = True
+                    if chunk:
+                        fut = pool.submit(_grep_chunk, chunk, source, flags,
+                                          literal, self.max_hits_per_file)
+                        pending[fut] = len(chunk)
+                if not pending:
+                    break
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    scanned += pending.pop(fut)
+                    yield scanned, fut.result()
+        finally:
+            for fut in pending:
+                fut.cancel()
@@ -0,0 +1,359 @@
+import os
+import stat
+import time
+import errno
+import shutil
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
+
+from rich.text import Text
+
+from .dir_size import format_size
+from .fs_walker import ParallelWalker, bounded_submit
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
+# ioctl(2) request that shares the source's extents (Btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+# errnos meaning "this method doesn't work for these files", not a real failure
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP,
+                errno.ENOTTY, errno.EBADF, errno.EPERM, errno.ETXTBSY}
+
+
+class CopyProgress(NamedTuple):
+    bytes_done: int
+    bytes_total: int
+    files_done: int
+    files_total: int
+    rate: float              # bytes/s over the last few seconds
+    eta: float | None        # seconds left, None until a rate is known
+
+
+class CopyReport(NamedTuple):
+    path: str
+    bytes: int
+    files: int
+    elapsed: float
+    methods: dict[str, int]  # files copied by each method
+    skipped: list[str]       # sockets, FIFOs and devices, which aren't copied
+
+
+class CopyEngine:
+    """
+    Copies a file or directory tree off the UI thread, with progress and
+    cancellation.
+
+    File data is moved by the cheapest method the filesystems allow, tried
+    in order: a reflink (`FICLONE`, no data copied at all), then
+    `copy_file_range` and `sendfile`, which copy inside the kernel, then
+    plain reads and writes through one large buffer. A method that fails
+    as unsupported is not tried again for the same pair of devices. Data
+    is copied `chunk_size` bytes per call, so progress is reported and
+    cancellation noticed between chunks.
+
+    A tree is sized up first (with the parallel walker, for the ETA), its
+    directories are created, and files are copied by `workers` threads.
+    Symlinks are copied as links. A single file is written under a
+    temporary name and renamed into place when complete. A cancelled or
+    failed copy removes everything it created, so it never leaves a
+    half-written file behind.
+    """
+
+    def __init__(self, workers: int = 4, chunk_size: int = 8 * 1024 * 1024,
+                 buffer_size: int = 1024 * 1024, progress_interval: float = 0.1):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        self.progress_interval = progress_interval
+        # (method, source device, destination device) pairs that failed as unsupported
+        self._unsupported: set[tuple[str, int, int]] = set()
+
+    def copy(self, source: str, dest: str,
+             progress: Callable[[CopyProgress], None] | None = None,
+             cancelled: Callable[[], bool] | None = None) -> CopyReport | None:
+        """
+        Copy `source` to `dest` (the new path itself, not its parent),
+        returning once everything is on disk. An existing file at `dest` is
+        replaced; an existing directory is an error. Returns None if
+        cancelled.
+        """
+        start = time.monotonic()
+        source = os.path.abspath(source)
+        dest = os.path.abspath(dest)
+        cancelled = cancelled or (lambda: False)
+        if os.path.isdir(source) and not os.path.islink(source):
+            if (dest + os.sep).startswith(source + os.sep):
+                raise ValueError(f"Can't copy {source} into itself")
+            return self._copy_tree(source, dest, start, progress, cancelled)
+        return self._copy_single(source, dest, start, progress, cancelled)
+
+    ## Planning ##
+    def _copy_single(self, source, dest, start, progress, cancelled) -> CopyReport | None:
+        size = os.stat(source).st_size
+        temp = os.path.join(os.path.dirname(dest), f".{os.path.basename(dest)}.part")
+        tracker = _Tracker(size, 1, progress, self.progress_interval)
+        try:
+            method = self._copy_file(source, temp, tracker, cancelled)
+            if method is None:
+                return None
+            os.replace(temp, dest)
+        finally:
+            if os.path.lexists(temp):
+                os.unlink(temp)
+        return CopyReport(dest, tracker.bytes_done, 1, time.monotonic() - start, {method: 1}, [])
+
+    def _copy_tree(self, source, dest, start, progress, cancelled) -> CopyReport | None:
+        listed: set[str] = set()
+        expected = {source}
+        files: list[tuple[str, int]] = []
+        walker = ParallelWalker(skip_dirs=(), stat_files=True)
+        for listing in walker.walk(source, cancelled=cancelled):
+            listed.add(listing.path)
+            expected.update(os.path.join(listing.path, name) for name in listing.dirs)
+            relative = os.path.relpath(listing.path, source)
+            files += [(os.path.normpath(os.path.join(relative, name)), size)
+                      for name, size in zip(listing.files, listing.sizes)]
+        if cancelled():
+            return None
+        # The walker skips directories it can't read; a copy missing them would look complete
+        unreadable = expected - listed
+        if unreadable:
+            raise PermissionError(f"Can't read directory: {min(unreadable)}")
+
+        # Parents before children; mkdir of the root fails if `dest` exists
+        dirs = sorted((os.path.relpath(path, source) for path in listed if path != source),
+                      key=lambda d: (d.count(os.sep), d))
+        os.mkdir(dest)
+        try:
+            for relative in dirs:
+                os.mkdir(os.path.join(dest, relative))
+            report = self._copy_files(source, dest, files, start, progress, cancelled)
+            if report is None:
+                shutil.rmtree(dest, ignore_errors=True)
+                return None
+            # Directory times last, once nothing more is written into them
+            for relative in reversed(dirs):
+                shutil.copystat(os.path.join(source, relative), os.path.join(dest, relative))
+            shutil.copystat(source, dest)
+        except BaseException:
+            shutil.rmtree(dest, ignore_errors=True)
+            raise
+        return report
+
+    def _copy_files(self, source, dest, files, start, progress, cancelled) -> CopyReport | None:
+        tracker = _Tracker(sum(size for _, size in files), len(files), progress, self.progress_interval)
+        methods: Counter[str] = Counter()
+        skipped: list[str] = []
+        lock = threading.Lock()
+        stop = threading.Event()
+        stopped = lambda: stop.is_set() or cancelled()
+
+        def copy_one(relative: str) -> None:
+            method = self._copy_file(os.path.join(source, relative), os.path.join(dest, relative),
+                                     tracker, stopped)
+            with lock:
+                if method == "skipped":
+                    skipped.append(relative)
+                elif method is not None:
+                    methods[method] += 1
+
+        backlog = deque(relative for relative, _ in files)
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="copy")
+        try:
+            for done in bounded_submit(pool, copy_one, backlog, self.workers * 4,
+                                       timeout=self.progress_interval, stopped=stop.is_set):
+                for _, future in done:
+                    future.result()
+                tracker.report(force=False)
+                if cancelled():
+                    stop.set()
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            # Running copies see `stop` at their next chunk
+            pool.shutdown(wait=True, cancel_futures=True)
+        if stop.is_set():
+            return None
+        return CopyReport(dest, tracker.bytes_done, tracker.files_done - len(skipped),
+                          time.monotonic() - start, dict(methods), skipped)
+
+    ## Copying one file ##
+    def _copy_file(self, source: str, dest: str, tracker: "_Tracker",
+                   cancelled: Callable[[], bool]) -> str | None:
+        """Copy one entry; returns the method used, "skipped", or None if cancelled."""
+        if cancelled():
+            return None
+        st = os.lstat(source)
+        if stat.S_ISLNK(st.st_mode):
+            os.symlink(os.readlink(source), dest)
+            # Sizes in the plan are lstat sizes; count them so the total adds up
+            tracker.advance(st.st_size, files=1)
+            return "symlink"
+        if not stat.S_ISREG(st.st_mode):
+            tracker.advance(st.st_size, files=1)
+            return "skipped"
+
+        infd = os.open(source, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            outfd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+            try:
+                method = self._copy_data(infd, outfd, st.st_dev, tracker, cancelled)
+            finally:
+                os.close(outfd)
+        finally:
+            os.close(infd)
+        if method is not None:
+            shutil.copystat(source, dest)
+            tracker.advance(0, files=1)
+        return method
+
+    def _copy_data(self, infd: int, outfd: int, src_dev: int, tracker: "_Tracker",
+                   cancelled: Callable[[], bool]) -> str | None:
+        devices = (src_dev, os.fstat(outfd).st_dev)
+        if fcntl is not None and self._supported("reflink", devices):
+            try:
+                fcntl.ioctl(outfd, FICLONE, infd)
+            except OSError:
+                self._unsupported.add(("reflink", *devices))
+            else:
+                tracker.advance(os.fstat(infd).st_size)
+                return "reflink"
+
+        for method, call in (("copy_file_range", self._copy_file_range), ("sendfile", self._sendfile)):
+            if not self._supported(method, devices):
+                continue
+            try:
+                copied = self._kernel_copy(call, infd, outfd, tracker, cancelled)
+            except OSError as e:
+                # A failure part way through is real (ENOSPC, EIO); only a refusal up front falls back
+                if e.errno not in _UNSUPPORTED or os.lseek(infd, 0, os.SEEK_CUR) != 0:
+                    raise
+                self._unsupported.add((method, *devices))
+                continue
+            if copied is None:
+                return None
+            if copied:
+                return method
+            # Nothing copied: an empty file, or one that misreports its size (procfs)
+            break
+
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        while True:
+            if cancelled():
+                return None
+            n = os.readv(infd, [buffer])
+            if not n:
+                return "buffered"
+            written = 0
+            while written < n:
+                written += os.write(outfd, view[written:n])
+            tracker.advance(n)
+
+    def _supported(self, method: str, devices: tuple[int, int]) -> bool:
+        return (method, *devices) not in self._unsupported
+
+    def _copy_file_range(self, infd: int, outfd: int) -> int:
+        return os.copy_file_range(infd, outfd, self.chunk_size)
+
+    def _sendfile(self, infd: int, outfd: int) -> int:
+        return os.sendfile(outfd, infd, None, self.chunk_size)
+
+    @staticmethod
+    def _kernel_copy(call, infd: int, outfd: int, tracker: "_Tracker",
+                     cancelled: Callable[[], bool]) -> int | None:
+        """Copy with `call` until EOF; bytes copied, or None if cancelled."""
+        total = 0
+        while True:
+            if cancelled():
+                return None
+            n = call(infd, outfd)
+            if not n:
+                return total
+            total += n
+            tracker.advance(n)
+
+
+class _Tracker:
+    """Byte and file counters shared by the copying threads, with rate-limited reporting."""
+
+    RATE_WINDOW = 3.0    # seconds of history behind the rate and ETA
+
+    def __init__(self, bytes_total: int, files_total: int,
+                 callback: Callable[[CopyProgress], None] | None, interval: float):
+        self.bytes_total = bytes_total
+        self.files_total = files_total
+        self.bytes_done = 0
+        self.files_done = 0
+        self.callback = callback
+        self.interval = interval
+        self._samples: deque[tuple[float, int]] = deque([(time.monotonic(), 0)])
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, nbytes: int, files: int = 0) -> None:
+        with self._lock:
+            self.bytes_done += nbytes
+            self.files_done += files
+        self.report(force=False)
+
+    def report(self, force: bool = True) -> None:
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            samples = self._samples
+            samples.append((now, self.bytes_done))
+            while len(samples) > 2 and now - samples[0][0] > self.RATE_WINDOW:
+                samples.popleft()
+            then, before = samples[0]
+            rate = (self.bytes_done - before) / (now - then) if now > then else 0.0
+            remaining = max(0, self.bytes_total - self.bytes_done)
+            eta = remaining / rate if rate > 0 else None
+            snapshot = CopyProgress(self.bytes_done, self.bytes_total, self.files_done,
+                                    self.files_total, rate, eta)
+        self.callback(snapshot)
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds + 0.5)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def progress_text(source: str, dest: str, progress: CopyProgress, bar_width: int = 30) -> Text:
+    share = progress.bytes_done / progress.bytes_total if progress.bytes_total else 0.0
+    filled = round(min(share, 1.0) * bar_width)
+    eta = f"  ·  {_format_eta(progress.eta)} left" if progress.eta is not None else ""
+    return Text.assemble(
+        ("Copying ", "bold"), source, "\n", ("     to ", "bold"), dest, "\n\n",
+        ("█" * filled, "cyan"), ("░" * (bar_width - filled), "dim"), f" {share:.0%}\n",
+        f"{format_size(progress.bytes_done)} of {format_size(progress.bytes_total)}"
+        f"  ·  {progress.files_done:,} of {progress.files_total:,} files"
+        f"  ·  {format_size(int(progress.rate))}/s{eta}\n\n",
+        ("Press X to cancel", "dim"),
+    )
+
+
+def report_text(report: CopyReport) -> Text:
+    rate = report.bytes / report.elapsed if report.elapsed > 0 else 0.0
+    methods = ", ".join(f"{count:,} by {method}" for method, count in sorted(report.methods.items()))
+    text = Text.assemble(
+        ("Copied to: ", "green"), report.path, "\n\n",
+        f"{format_size(report.bytes)} in {report.files:,} files, {report.elapsed:.1f} s "
+        f"({format_size(int(rate))}/s)\n",
+        (methods, "dim"),
+    )
+    if report.skipped:
+        text.append(f"\nSkipped {len(report.skipped)} special files (sockets, FIFOs, devices)", style="yellow")
+    return text
@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class Listing:
+    """
+    One directory's entries, in tree order (directories first, then by
+    case-insensitive name), with the type of each entry from `scandir`.
+    """
+
+    __slots__ = ("path", "mtime_ns", "names", "is_dir")
+
+    def __init__(self, path: str, mtime_ns: int, names: list[str], is_dir: list[bool]):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.names = names
+        self.is_dir = is_dir
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def entries(self, show_hidden: bool = True) -> list[tuple[str, bool]]:
+        """(name, is_dir) pairs, leaving out dot-files unless `show_hidden`."""
+        pairs = zip(self.names, self.is_dir)
+        if show_hidden:
+            return list(pairs)
+        return [pair for pair in pairs if not pair[0].startswith(".")]
+
+
+def scan(path: str) -> Listing | None:
+    """List `path` with one `scandir` pass, or None if it can't be read."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        rows: list[tuple[bool, str, str]] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # d_type answers this without a stat, except for symlinks
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                rows.append((not is_dir, entry.name.lower(), entry.name))
+    except OSError:
+        return None
+    rows.sort()
+    return Listing(path, mtime_ns, [row[2] for row in rows], [not row[0] for row in rows])
+
+
+class DirCache:
+    """
+    Directory listings shared by the tree, keyed by each directory's mtime.
+
+    Re-opening an unchanged directory costs a single `stat` of the
+    directory itself instead of a `scandir` plus a type check per entry,
+    which matters for huge folders and slow network mounts. Listings are
+    evicted least recently used first once they hold more than
+    `max_entries` names in total.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._listings: OrderedDict[str, Listing] = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def listing(self, path: str | os.PathLike) -> Listing | None:
+        """The listing of `path`, re-scanned only if the directory's mtime changed."""
+        path = os.fspath(path)
+        cached = self.cached(path)
+        if cached is not None:
+            try:
+                if os.stat(path).st_mtime_ns == cached.mtime_ns:
+                    return cached
+            except OSError:
+                self.invalidate(path)
+                return None
+        listing = scan(path)
+        if listing is None:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            old = self._listings.pop(path, None)
+            if old is not None:
+                self._total -= len(old)
+            self._listings[path] = listing
+            self._total += len(listing)
+            while self._total > self.max_entries and len(self._listings) > 1:
+                _, evicted = self._listings.popitem(last=False)
+                self._total -= len(evicted)
+        return listing
+
+    def cached(self, path: str | os.PathLike) -> Listing | None:
+        """The last listing of `path`, without touching the disk."""
+        path = os.fspath(path)
+        with self._lock:
+            listing = self._listings.get(path)
+            if listing is not None:
+                self._listings.move_to_end(path)
+            return listing
+
+    def invalidate(self, path: str | os.PathLike) -> None:
+        with self._lock:
+            listing = self._listings.pop(os.fspath(path), None)
+            if listing is not None:
+                self._total -= len(listing)
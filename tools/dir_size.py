@@ -0,0 +1,224 @@
+import os
+import time
+import threading
+from typing import Callable, NamedTuple
+
+from rich.console import Group, RenderableType
+from rich.table import Table
+from rich.text import Text
+
+from .fs_walker import DirListing, ParallelWalker, list_dir
+
+
+class DirSize(NamedTuple):
+    """Cached sizes for one directory."""
+    mtime_ns: int
+    own_bytes: int           # files directly inside
+    own_files: int
+    subdirs: list[str]
+    listed_at: float         # when the own-file sums were taken
+    # Whole subtree; None until a walk has covered every subdirectory
+    total_bytes: int | None = None
+    total_files: int | None = None
+    total_dirs: int | None = None
+    computed_at: float = 0.0
+
+
+class SizeProgress(NamedTuple):
+    dirs: int
+    files: int
+    bytes: int
+
+
+class SizeReport(NamedTuple):
+    path: str
+    total_bytes: int
+    total_files: int
+    total_dirs: int
+    # (name, bytes, is_dir) of the biggest direct children, largest first
+    largest: list[tuple[str, int, bool]]
+    elapsed: float
+    reused_dirs: int         # subtrees answered from the cache instead of walked
+
+
+class SizeIndex:
+    """
+    Directory sizes (`du`), computed with the parallel walker and cached
+    per directory.
+
+    Each directory's own files are summed once and reused while the
+    directory's mtime is unchanged. Subtree totals are kept too, so after
+    measuring `a/b` a walk of `a` takes `b`'s total as is instead of
+    descending into it, as long as `b`'s mtime still matches. A file
+    growing in place doesn't change its directory's mtime, so both the
+    sums and the totals are also dropped once they are older than
+    `max_age` seconds. Sizes are apparent sizes; symlinks are not
+    followed and a hard-linked file counts once per link.
+    """
+
+    def __init__(self, max_age: float = 300.0, walker: ParallelWalker | None = None):
+        self.max_age = max_age
+        self.walker = walker or ParallelWalker(stat_files=True)
+        self._dirs: dict[str, DirSize] = {}
+        self._lock = threading.Lock()
+
+    def _fresh_total(self, path: str, entry: DirSize | None) -> DirSize | None:
+        if entry is None or entry.total_bytes is None:
+            return None
+        if time.monotonic() - entry.computed_at > self.max_age:
+            return None
+        try:
+            if os.stat(path).st_mtime_ns != entry.mtime_ns:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def measure(self, root: str,
+                progress: Callable[[SizeProgress], None] | None = None,
+                cancelled: Callable[[], bool] | None = None,
+                top: int = 10,
+                progress_interval: float = 0.1) -> SizeReport | None:
+        """
+        Size of `root` and its `top` largest children. Blocking: call from a
+        worker thread. `progress` is called every `progress_interval`
+        seconds while walking. Returns None if cancelled.
+        """
+        start = time.monotonic()
+        root = os.path.abspath(root)
+        with self._lock:
+            known = dict(self._dirs)
+        own: dict[str, DirSize] = {}
+        reused: dict[str, DirSize] = {}
+        lock = threading.Lock()
+
+        def lister(dirpath: str) -> DirListing | None:
+            entry = known.get(dirpath)
+            if dirpath != root:
+                fresh = self._fresh_total(dirpath, entry)
+                if fresh is not None:
+                    with lock:
+                        reused[dirpath] = fresh
+                    return DirListing(dirpath, fresh.mtime_ns, [], [])
+            try:
+                mtime_ns = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                return None
+            if (entry is not None and entry.mtime_ns == mtime_ns
+                    and time.monotonic() - entry.listed_at <= self.max_age):
+                sizes = DirSize(mtime_ns, entry.own_bytes, entry.own_files, entry.subdirs, entry.listed_at)
+            else:
+                listing = list_dir(dirpath, stat_files=True)
+                if listing is None:
+                    return None
+                sizes = DirSize(listing.mtime_ns, sum(listing.sizes), len(listing.files), listing.dirs,
+                                time.monotonic())
+            with lock:
+                own[dirpath] = sizes
+            # Subdirectories with a usable total aren't walked; the lister answers them above
+            return DirListing(dirpath, sizes.mtime_ns, sizes.subdirs, [], [])
+
+        walked = SizeProgress(0, 0, 0)
+        last_report = 0.0
+        for listing in self.walker.walk(root, cancelled=cancelled, lister=lister):
+            with lock:
+                sizes = own.get(listing.path) or reused[listing.path]
+            if sizes.total_bytes is not None:
+                walked = SizeProgress(walked.dirs + sizes.total_dirs, walked.files + sizes.total_files,
+                                      walked.bytes + sizes.total_bytes)
+            else:
+                walked = SizeProgress(walked.dirs + 1, walked.files + sizes.own_files,
+                                      walked.bytes + sizes.own_bytes)
+            now = time.monotonic()
+            if progress is not None and now - last_report >= progress_interval:
+                last_report = now
+                progress(walked)
+        if cancelled is not None and cancelled():
+            self._remember(own)
+            return None
+        if root not in own:
+            raise FileNotFoundError(f"Can't read directory: {root}")
+
+        # Totals bottom-up: deepest directories first
+        now = time.monotonic()
+        totals = dict(reused)
+        for dirpath in sorted(own, key=lambda p: p.count(os.sep), reverse=True):
+            sizes = own[dirpath]
+            total_bytes, total_files, total_dirs = sizes.own_bytes, sizes.own_files, 1
+            for name in sizes.subdirs:
+                child = totals.get(os.path.join(dirpath, name))
+                if child is not None:   # unreadable or vanished: counts as empty
+                    total_bytes += child.total_bytes
+                    total_files += child.total_files
+                    total_dirs += child.total_dirs
+            totals[dirpath] = sizes._replace(total_bytes=total_bytes, total_files=total_files,
+                                             total_dirs=total_dirs, computed_at=now)
+        with self._lock:
+            self._dirs.update((path, totals[path]) for path in own)
+
+        report = totals[root]
+        largest = [(name, totals[os.path.join(root, name)].total_bytes, True)
+                   for name in report.subdirs if os.path.join(root, name) in totals]
+        # File sizes aren't cached per file; one more listing of the root itself
+        listing = list_dir(root, stat_files=True)
+        if listing is not None:
+            largest += [(name, size, False) for name, size in zip(listing.files, listing.sizes)]
+        largest.sort(key=lambda child: child[1], reverse=True)
+        return SizeReport(root, report.total_bytes, report.total_files, report.total_dirs - 1,
+                          largest[:top], time.monotonic() - start, len(reused))
+
+    def _remember(self, own: dict[str, DirSize]) -> None:
+        # Keep what a cancelled walk learned about each directory's own files
+        with self._lock:
+            for path, sizes in own.items():
+                entry = self._dirs.get(path)
+                if entry is None or entry.mtime_ns != sizes.mtime_ns:
+                    self._dirs[path] = sizes
+
+    def invalidate(self, path: str) -> None:
+        """Forget the total of `path` and every directory above it."""
+        path = os.path.abspath(path)
+        with self._lock:
+            while True:
+                entry = self._dirs.get(path)
+                if entry is not None:
+                    self._dirs[path] = entry._replace(total_bytes=None)
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return
+                path = parent
+
+
+def format_size(nbytes: int) -> str:
+    size = float(nbytes)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def progress_text(path: str, progress: SizeProgress) -> Text:
+    return Text.assemble(("Directory: ", "bold"), path, "\n\n",
+                         (f"Measuring… {format_size(progress.bytes)} in {progress.files:,} files, "
+                          f"{progress.dirs:,} folders", "dim"))
+
+
+def rich_report(report: SizeReport, bar_width: int = 20) -> RenderableType:
+    """Total, counts and a bar chart of the largest children."""
+    header = Text.assemble(
+        ("Directory: ", "bold"), report.path, "\n\n",
+        ("Total: ", "bold"), format_size(report.total_bytes),
+        f"  ·  {report.total_files:,} files  ·  {report.total_dirs:,} folders",
+        (f"  ({report.elapsed:.1f} s)", "dim"), "\n",
+    )
+    table = Table(box=None, show_header=False, padding=(0, 1))
+    table.add_column(justify="right")
+    table.add_column()
+    table.add_column(justify="right", style="dim")
+    table.add_column()
+    for name, nbytes, is_dir in report.largest:
+        share = nbytes / report.total_bytes if report.total_bytes else 0.0
+        bar = "█" * round(share * bar_width)
+        table.add_row(format_size(nbytes), Text(bar, style="cyan"), f"{share:.0%}",
+                      Text(name + ("/" if is_dir else ""), style="bold" if is_dir else ""))
+    return Group(header, table)
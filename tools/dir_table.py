@@ -0,0 +1,167 @@
+import os
+import stat
+import threading
+from array import array
+from itertools import compress, repeat
+from operator import contains
+from typing import Callable
+
+# Entry kinds, in the order the "type" column sorts them
+KIND_DIR, KIND_FILE, KIND_LINK, KIND_OTHER = range(4)
+COLUMNS = ("name", "size", "modified", "perms", "type")
+
+
+class DirTable:
+    """
+    Metadata for every entry of one directory, stored column-wise: a list
+    of names plus flat `array`s of sizes, mtimes, modes and kinds, instead
+    of an object per row.
+
+    `order` returns row indices sorted by a column and optionally filtered
+    by a name substring. Each column's ascending order is computed once
+    (a stable sort on top of the name order, so ties stay alphabetical)
+    and reused for descending sorts and every later filter; `prepare`
+    computes them all up front, off the UI thread. Name matches are
+    tested with a C-level `map` and narrowed incrementally as a filter
+    grows; a small match set is put in order through each column's rank
+    (inverse order) instead of a pass over every row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names: list[str] = []
+        self.sizes = array("q")      # -1 for directories
+        self.mtimes = array("d")
+        self.modes = array("L")
+        self.kinds = array("B")
+        self._lower: list[str] | None = None
+        self._types: list[str] | None = None
+        self._orders: dict[str, array] = {}
+        self._ranks: dict[str, array] = {}
+        self._needle = ""
+        self._matches: list[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def scan(cls, path: str, show_hidden: bool = True,
+             cancelled: Callable[[], bool] | None = None) -> "DirTable | None":
+        """List and `lstat` every entry of `path`; None if cancelled or unreadable."""
+        table = cls(path)
+        names, sizes, mtimes, modes, kinds = table.names, table.sizes, table.mtimes, table.modes, table.kinds
+        try:
+            with os.scandir(path) as it:
+                for count, entry in enumerate(it):
+                    if cancelled is not None and count % 1024 == 0 and cancelled():
+                        return None
+                    if not show_hidden and entry.name.startswith("."):
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    mode = st.st_mode
+                    if stat.S_ISDIR(mode):
+                        kind = KIND_DIR
+                    elif stat.S_ISREG(mode):
+                        kind = KIND_FILE
+                    elif stat.S_ISLNK(mode):
+                        kind = KIND_LINK
+                    else:
+                        kind = KIND_OTHER
+                    names.append(entry.name)
+                    sizes.append(-1 if kind == KIND_DIR else st.st_size)
+                    mtimes.append(st.st_mtime)
+                    modes.append(mode)
+                    kinds.append(kind)
+        except OSError:
+            return None
+        return table
+
+    def type_of(self, row: int) -> str:
+        kind = self.kinds[row]
+        if kind == KIND_DIR:
+            return "dir"
+        if kind == KIND_LINK:
+            return "link"
+        if kind == KIND_OTHER:
+            return "other"
+        ext = os.path.splitext(self.names[row])[1]
+        return ext[1:].lower() if ext else "file"
+
+    def perms(self, row: int) -> str:
+        return stat.filemode(self.modes[row])
+
+    def _ascending(self, column: str) -> array:
+        order = self._orders.get(column)
+        if order is not None:
+            return order
+        if self._lower is None:
+            self._lower = [name.lower() for name in self.names]
+        if column == "name":
+            keys = self._lower
+            rows = range(len(self))
+        else:
+            rows = self._ascending("name")
+            if column == "size":
+                keys = self.sizes
+            elif column == "modified":
+                keys = self.mtimes
+            elif column == "perms":
+                keys = self.modes
+            elif column == "type":
+                if self._types is None:
+                    self._types = [f"{kind}{self.type_of(i)}" for i, kind in enumerate(self.kinds)]
+                keys = self._types
+            else:
+                raise ValueError(f"Unknown column: {column}")
+        order = self._orders[column] = array("l", sorted(rows, key=keys.__getitem__))
+        return order
+
+    def prepare(self, cancelled: Callable[[], bool] | None = None) -> None:
+        """Compute every column's sort order and rank now, so later sorts are instant."""
+        for column in COLUMNS:
+            if cancelled is not None and cancelled():
+                return
+            with self._lock:
+                self._rank(column)
+
+    def _rank(self, column: str) -> array:
+        rank = self._ranks.get(column)
+        if rank is None:
+            rank = self._ranks[column] = array("l", bytes(len(self) * array("l").itemsize))
+            for position, row in enumerate(self._ascending(column)):
+                rank[row] = position
+        return rank
+
+    def _match(self, needle: str) -> list[int]:
+        """Rows whose name contains `needle`, in row order."""
+        if needle != self._needle:
+            lower = self._lower
+            if self._needle and needle.startswith(self._needle):
+                # A longer needle only ever matches a subset of the rows
+                matches = [row for row in self._matches if needle in lower[row]]
+            else:
+                matches = list(compress(range(len(lower)), map(contains, lower, repeat(needle))))
+            self._needle, self._matches = needle, matches
+        return self._matches
+
+    def order(self, column: str = "name", reverse: bool = False, needle: str = "") -> array:
+        """Row indices sorted by `column`, keeping names that contain `needle` (case-insensitive)."""
+        with self._lock:
+            return self._order(column, reverse, needle)
+
+    def _order(self, column: str, reverse: bool, needle: str) -> array:
+        order = self._ascending(column)
+        if needle:
+            matches = self._match(needle.lower())
+            if len(matches) * 8 < len(order):
+                order = array("l", sorted(matches, key=self._rank(column).__getitem__))
+            else:
+                keep = bytearray(len(order))
+                for row in matches:
+                    keep[row] = 1
+                order = array("l", compress(order, map(keep.__getitem__, order)))
+        return order[::-1] if reverse else order
@@ -0,0 +1,210 @@
+import os
+import contextlib
+import pickle
+import hashlib
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .cache_dir import cache_path
+from .fs_walker import DirListing, ParallelWalker, list_dir
+
+INDEX_VERSION = 2
+# The stored index is split by directory path into this many files, so a
+# refresh only rewrites the files holding directories that changed
+SHARDS = 64
+
+
+def shard_of(dirpath: str) -> int:
+    """Stable shard number of `dirpath` (unlike `hash`, the same in every run)."""
+    return zlib.crc32(dirpath.encode("utf-8", "surrogateescape")) % SHARDS
+
+
+class FileIndex:
+    """
+    Persistent filename index for a single search root.
+
+    The index maps every directory under `root` to its mtime and the names
+    of its sub-directories and files. It is built once, saved under the
+    user cache directory, and refreshed incrementally: a directory is only
+    re-listed when its mtime changed, so a refresh costs one `stat` per
+    directory instead of a full walk. Both run on the parallel walker,
+    which skips pseudo-filesystems such as /proc. On disk the index is
+    split into `SHARDS` files by directory path, and a refresh rewrites
+    only the shards whose directories changed.
+    """
+
+    _instances: dict[str, "FileIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, root: str, min_refresh_age: float = 30.0,
+                 walker: ParallelWalker | None = None):
+        self.root = os.path.abspath(root)
+        self.min_refresh_age = min_refresh_age
+        self.walker = walker or ParallelWalker()
+        # dirpath -> (mtime_ns, subdir names, file names)
+        self._dirs: dict[str, tuple[int, list[str], list[str]]] = {}
+        self._loaded = False
+        self._last_refresh = 0.0
+        # Bumped whenever the indexed listings change
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def for_root(cls, root: str) -> "FileIndex":
+        """Return the shared index for `root`, creating it on first use."""
+        key = os.path.abspath(root)
+        with cls._instances_lock:
+            index = cls._instances.get(key)
+            if index is None:
+                index = cls._instances[key] = cls(key)
+            return index
+
+    @property
+    def store_path(self) -> Path:
+        """Directory holding this root's shard files."""
+        digest = hashlib.sha1(self.root.encode("utf-8", "surrogateescape")).hexdigest()
+        return cache_path("index") / digest
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return sum(len(files) for _, _, files in self._dirs.values())
+
+    def ensure_loaded(self,
+                      on_dir: Callable[[str, list[str]], None] | None = None,
+                      cancelled: Callable[[], bool] | None = None) -> bool:
+        """
+        Load the index from disk, or build it from scratch if there is no
+        usable copy.
+
+        Returns True if the index had to be built, in which case `on_dir`
+        has already been called for every directory.
+        """
+        with self._lock:
+            if self._loaded:
+                return False
+            if self._load():
+                self._loaded = True
+                return False
+        self.refresh(on_dir=on_dir, cancelled=cancelled)
+        return True
+
+    def listings(self) -> Iterator[tuple[str, list[str]]]:
+        """Yield (dirpath, filenames) for every indexed directory."""
+        for dirpath, (_, _, filenames) in self._dirs.items():
+            yield dirpath, filenames
+
+    def refresh(self,
+                on_dir: Callable[[str, list[str]], None] | None = None,
+                cancelled: Callable[[], bool] | None = None) -> int:
+        """
+        Bring the index up to date with the filesystem.
+
+        Unchanged directories (same mtime) reuse their stored listing;
+        changed ones are re-listed. `on_dir(dirpath, filenames)` is called
+        as each directory is visited, so callers can stream results while
+        the index is being built. If `cancelled()` turns true the walk stops
+        and the previous index is kept. Returns the number of directories
+        that had to be re-listed.
+        """
+        with self._refresh_lock:
+            old = self._dirs
+            new: dict[str, tuple[int, list[str], list[str]]] = {}
+            rescanned = 0
+            dirty: set[int] = set()
+
+            def lister(dirpath: str) -> DirListing | None:
+                try:
+                    mtime_ns = os.stat(dirpath).st_mtime_ns
+                except OSError:
+                    return None
+                entry = old.get(dirpath)
+                if entry is not None and entry[0] == mtime_ns:
+                    return DirListing(dirpath, mtime_ns, entry[1], entry[2])
+                return list_dir(dirpath)
+
+            for listing in self.walker.walk(self.root, cancelled=cancelled, lister=lister):
+                entry = old.get(listing.path)
+                if entry is None or entry[0] != listing.mtime_ns:
+                    rescanned += 1
+                    dirty.add(shard_of(listing.path))
+                new[listing.path] = (listing.mtime_ns, listing.dirs, listing.files)
+                if on_dir is not None:
+                    on_dir(listing.path, listing.files)
+            if cancelled is not None and cancelled():
+                return 0
+            if not old:
+                # Fresh build: every shard file must exist, even empty ones
+                dirty = set(range(SHARDS))
+            elif len(new) != len(old) or rescanned:
+                # Directories that are gone leave their shards behind too
+                dirty.update(map(shard_of, old.keys() - new.keys()))
+
+            with self._lock:
+                self._dirs = new
+                self._loaded = True
+                self._last_refresh = time.monotonic()
+                if rescanned or len(new) != len(old):
+                    self.generation += 1
+            if dirty:
+                self._save(dirty)
+            return rescanned
+
+    def refresh_in_background(self) -> None:
+        """Rescan stale subtrees on a daemon thread, unless one is already running."""
+        if time.monotonic() - self._last_refresh < self.min_refresh_age:
+            return
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def _load(self) -> bool:
+        dirs: dict[str, tuple[int, list[str], list[str]]] = {}
+        for shard in range(SHARDS):
+            try:
+                with open(self.store_path / f"{shard:02d}.pickle", "rb") as fh:
+                    data = pickle.load(fh)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+                return False
+            if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+                return False
+            dirs.update(data["dirs"])
+        self._dirs = dirs
+        self.generation += 1
+        return True
+
+    def _save(self, shards: set[int]) -> None:
+        """Rewrite the shard files numbered in `shards` from the current index."""
+        parts: dict[int, dict[str, tuple[int, list[str], list[str]]]] = {shard: {} for shard in shards}
+        for dirpath, entry in self._dirs.items():
+            part = parts.get(shard_of(dirpath))
+            if part is not None:
+                part[dirpath] = entry
+        try:
+            target = self.store_path
+            target.mkdir(exist_ok=True)
+        except OSError:
+            return
+        for shard, dirs in parts.items():
+            data = {"version": INDEX_VERSION, "root": self.root, "dirs": dirs}
+            tmp = None
+            try:
+                fd, tmp = tempfile.mkstemp(dir=target, suffix=".tmp")
+                with os.fdopen(fd, "wb") as fh:
+                    pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, target / f"{shard:02d}.pickle")
+            except OSError:
+                if tmp is not None:
+                    with contextlib.suppress(OSError):
+                        os.unlink(tmp)
+                return
+        # Single-file index written by earlier versions
+        with contextlib.suppress(OSError):
+            os.unlink(target.with_suffix(".pickle"))
@@ -0,0 +1,148 @@
+import io
+import os
+import re
+import math
+import shutil
+import contextlib
+import threading
+import subprocess
+from pathlib import Path
+
+from PIL import Image
+
+from .prefetch import is_prefetching
+
+_DURATION_RE = re.compile(rb"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+class FrameService:
+    """
+    Grab still frames from videos with ffmpeg.
+
+    At most `max_workers` ffmpeg processes run at once (callers beyond
+    that wait for a slot) and each is killed after `timeout` seconds, so a
+    broken or slow network-mounted file can't hang a preview. Prefetch
+    jobs may hold all but one slot, so the preview on screen never waits
+    behind them. Frames are
+    taken from a keyframe at `position` (a fraction of the duration)
+    rather than frame 0, scaled inside ffmpeg and returned as raw RGB
+    (PPM) instead of going through a PNG encode/decode.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 10.0,
+                 ffmpeg: str = "ffmpeg", ffprobe: str = "ffprobe"):
+        self.timeout = timeout
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe if shutil.which(ffprobe) else None
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._background = threading.BoundedSemaphore(max(1, max_workers - 1))
+
+    def _run(self, cmd: list[str], path: str | Path) -> tuple[int, bytes, bytes]:
+        with contextlib.ExitStack() as slots:
+            if is_prefetching():
+                slots.enter_context(self._background)
+            slots.enter_context(self._slots)
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                out, err = proc.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise TimeoutError(f"ffmpeg timed out after {self.timeout:g}s on {Path(path).name}")
+        return proc.returncode, out, err
+
+    def duration(self, path: str | Path) -> float | None:
+        """Length of the video in seconds, or None if it can't be determined."""
+        if self.ffprobe:
+            _, out, _ = self._run([self.ffprobe, "-v", "error", "-show_entries", "format=duration",
+                                   "-of", "default=noprint_wrappers=1:nokey=1", str(path)], path)
+            try:
+                return float(out)
+            except ValueError:
+                return None
+        # No ffprobe: ffmpeg prints the duration while failing for want of an output
+        _, _, err = self._run([self.ffmpeg, "-hide_banner", "-nostdin", "-i", str(path)], path)
+        match = _DURATION_RE.search(err)
+        if match is None:
+            return None
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    def _scale_filter(self, width: int, height: int) -> str:
+        return f"scale={width}:{height}:force_original_aspect_ratio=decrease:flags=area"
+
+    def _decode(self, cmd: list[str], path: str | Path) -> Image.Image:
+        code, out, err = self._run(cmd, path)
+        if not out:
+            message = err.decode("utf-8", "replace").strip().splitlines()
+            raise RuntimeError(message[-1] if message else f"ffmpeg exited with {code}")
+        img = Image.open(io.BytesIO(out))
+        img.load()
+        return img
+
+    def grab(self, path: str | Path, width: int, height: int,
+             position: float = 0.1) -> Image.Image:
+        """
+        One frame scaled to fit (width x height), taken from the keyframe
+        nearest `position` (0.0 = start, 1.0 = end). Falls back to the
+        start of the file when the duration is unknown or the seek fails.
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Video not found: {path}")
+        offset = 0.0
+        if position > 0:
+            duration = self.duration(path)
+            if duration:
+                offset = duration * position
+
+        def cmd(seek: float) -> list[str]:
+            return [self.ffmpeg, "-v", "error", "-nostdin",
+                    # Decode keyframes only, and keep the one the seek lands on
+                    # instead of discarding frames before the exact offset
+                    "-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{seek:.3f}",
+                    "-i", str(path),
+                    "-frames:v", "1", "-an", "-sn",
+                    "-vf", self._scale_filter(width, height),
+                    "-pix_fmt", "rgb24", "-c:v", "ppm", "-f", "image2pipe", "pipe:1"]
+
+        try:
+            return self._decode(cmd(offset), path)
+        except RuntimeError:
+            if not offset:
+                raise
+            return self._decode(cmd(0.0), path)
+
+    def filmstrip(self, path: str | Path, width: int, height: int,
+                  count: int = 4) -> Image.Image:
+        """
+        `count` evenly spaced frames tiled into a grid that fits
+        (width x height), from a single ffmpeg run.
+
+        The file is opened as `count` inputs, each with its own keyframe
+        seek, so the cost is `count` keyframe decodes in one process
+        rather than decoding the whole video to pick frames out of it.
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Video not found: {path}")
+        duration = self.duration(path)
+        if not duration:
+            raise RuntimeError(f"Can't determine the length of {Path(path).name}")
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+        cell_w, cell_h = max(1, width // cols), max(1, height // rows)
+
+        cmd = [self.ffmpeg, "-v", "error", "-nostdin"]
+        chains = []
+        for i in range(count):
+            cmd += ["-skip_frame", "nokey", "-noaccurate_seek",
+                    "-ss", f"{duration * (i + 0.5) / count:.3f}", "-i", str(path)]
+            # Same-sized cells so the frames can be concatenated and tiled
+            chains.append(f"[{i}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS,{self._scale_filter(cell_w, cell_h)},"
+                          f"pad={cell_w}:{cell_h}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=rgb24[f{i}]")
+        inputs = "".join(f"[f{i}]" for i in range(count))
+        graph = ";".join(chains) + f";{inputs}concat=n={count}:v=1:a=0," \
+                f"tile={cols}x{rows}:nb_frames={count}"
+        cmd += ["-filter_complex", graph, "-frames:v", "1",
+                "-pix_fmt", "rgb24", "-c:v", "ppm", "-f", "image2pipe", "pipe:1"]
+        return self._decode(cmd, path)
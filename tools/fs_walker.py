@@ -0,0 +1,163 @@
+import os
+import fnmatch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+# Kernel pseudo-filesystems: huge, volatile and never what a user searches for
+PSEUDO_FILESYSTEMS = frozenset({"/proc", "/sys", "/dev"})
+
+
+class DirListing(NamedTuple):
+    """One directory as seen by the walker."""
+    path: str
+    mtime_ns: int
+    dirs: list[str]
+    files: list[str]
+    # File sizes (parallel to `files`) when listed with stat_files=True
+    sizes: list[int] | None = None
+
+
+def list_dir(path: str, stat_files: bool = False) -> DirListing | None:
+    """
+    List a single directory with `os.scandir`, splitting entries into
+    sub-directories and files. Symlinks are never followed. Returns None
+    if the directory can't be read.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        dirs: list[str] = []
+        files: list[str] = []
+        sizes: list[int] | None = [] if stat_files else None
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append(entry.name)
+                    continue
+                files.append(entry.name)
+                if sizes is not None:
+                    try:
+                        sizes.append(entry.stat(follow_symlinks=False).st_size)
+                    except OSError:
+                        sizes.append(0)
+    except OSError:
+        return None
+    return DirListing(path, mtime_ns, dirs, files, sizes)
+
+
+def bounded_submit(pool: ThreadPoolExecutor,
+                   fn: Callable[[T], object],
+                   backlog: deque[T],
+                   max_inflight: int,
+                   lifo: bool = False,
+                   timeout: float | None = None,
+                   stopped: Callable[[], bool] | None = None) -> Iterator[list[tuple[T, Future]]]:
+    """
+    Run `fn(item)` on `pool` for the items in `backlog`, keeping at most
+    `max_inflight` futures queued while the rest wait in `backlog`, so a
+    huge tree never turns into millions of pending futures.
+
+    Yields each batch of finished (item, future) pairs; the caller may
+    append more items to `backlog` in between. With `timeout`, an empty
+    batch is yielded whenever nothing finished in that time. Once
+    `stopped()` returns true nothing new is submitted and the generator
+    ends after the running futures finish.
+    """
+    pending: dict[Future, T] = {}
+    while backlog or pending:
+        while backlog and len(pending) < max_inflight and not (stopped and stopped()):
+            item = backlog.pop() if lifo else backlog.popleft()
+            pending[pool.submit(fn, item)] = item
+        if not pending:
+            return
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        yield [(pending.pop(future), future) for future in done]
+
+
+class ParallelWalker:
+    """
+    Directory traversal engine shared by search, indexing and size
+    calculation.
+
+    Directories are listed with `os.scandir` on a bounded thread pool, so
+    slow `stat`/`getdents` calls (NFS, spinning disks) overlap instead of
+    queueing behind each other. Listings are yielded as they complete, in
+    no particular order.
+    """
+
+    def __init__(self,
+                 workers: int | None = None,
+                 skip_dirs: Iterable[str] = PSEUDO_FILESYSTEMS,
+                 ignore: Iterable[str] = (),
+                 max_depth: int | None = None,
+                 stat_files: bool = False):
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.skip_dirs = frozenset(os.path.abspath(p) for p in skip_dirs)
+        self.ignore = tuple(ignore)
+        self.max_depth = max_depth
+        self.stat_files = stat_files
+
+    def is_ignored(self, name: str, path: str) -> bool:
+        return any(fnmatch.fnmatch(name, pat) or fnmatch.fnmatch(path, pat)
+                   for pat in self.ignore)
+
+    def walk(self,
+             root: str,
+             cancelled: Callable[[], bool] | None = None,
+             lister: Callable[[str], DirListing | None] | None = None) -> Iterator[DirListing]:
+        """
+        Yield a DirListing for `root` and every directory below it.
+
+        `lister` replaces `list_dir` for callers that can answer from a
+        cache (e.g. the filename index reusing unchanged directories). The
+        walk stops as soon as `cancelled()` returns true or the generator
+        is closed.
+        """
+        root = os.path.abspath(root)
+        if lister is None:
+            stat_files = self.stat_files
+            lister = lambda path: list_dir(path, stat_files)
+
+        if cancelled is not None and cancelled():
+            return
+        backlog: deque[tuple[str, int]] = deque([(root, 0)])
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="walker")
+        try:
+            for done in bounded_submit(pool, lambda item: lister(item[0]), backlog,
+                                       self.workers * 4, lifo=True):
+                if cancelled is not None and cancelled():
+                    return
+                for (_, depth), fut in done:
+                    listing = fut.result()
+                    if listing is None:
+                        continue
+                    if self.ignore:
+                        listing = self._apply_ignore(listing)
+                    yield listing
+
+                    if self.max_depth is not None and depth >= self.max_depth:
+                        continue
+                    for name in listing.dirs:
+                        child = os.path.join(listing.path, name)
+                        if child in self.skip_dirs:
+                            continue
+                        backlog.append((child, depth + 1))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _apply_ignore(self, listing: DirListing) -> DirListing:
+        dirs = [d for d in listing.dirs
+                if not self.is_ignored(d, os.path.join(listing.path, d))]
+        keep = [i for i, f in enumerate(listing.files)
+                if not self.is_ignored(f, os.path.join(listing.path, f))]
+        if len(keep) == len(listing.files):
+            return listing._replace(dirs=dirs)
+        files = [listing.files[i] for i in keep]
+        sizes = [listing.sizes[i] for i in keep] if listing.sizes is not None else None
+        return listing._replace(dirs=dirs, files=files, sizes=sizes)
@@ -0,0 +1,276 @@
+import os
+import time
+import contextlib
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from typing import Callable, NamedTuple
+
+from .fs_walker import list_dir
+
+# inotify(7) constants
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ONLYDIR     = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = os.O_NONBLOCK
+IN_CLOEXEC     = getattr(os, "O_CLOEXEC", 0)
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR | IN_EXCL_UNLINK
+_EVENT = struct.Struct("iIII")
+# Polled directory whose first listing the watcher thread hasn't taken yet
+_PENDING = object()
+
+
+def _load_inotify():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_inotify()
+INOTIFY_AVAILABLE = _libc is not None
+
+
+class Change(NamedTuple):
+    """One change inside a watched directory."""
+    kind: str            # "created", "removed", "renamed", or "rescan" after lost events
+    directory: str
+    name: str = ""
+    is_dir: bool = False
+    # Where a renamed entry went; may be a different watched directory
+    new_directory: str = ""
+    new_name: str = ""
+
+
+class DirectoryWatcher:
+    """
+    Report entries created, removed or renamed in a set of directories.
+
+    Uses inotify where available, with one watch per directory and events
+    read on a background thread. A burst of events (unpacking an archive,
+    `rm -r`) is delivered to `on_change` as one batch, with rename pairs
+    already matched up. Where inotify is unavailable, or a watch can't be
+    added (e.g. the per-user watch limit is reached), directories are
+    polled instead: each poll is one `stat`, and a directory is only
+    re-listed and diffed when its mtime changed. The first listing of a
+    polled directory is taken on the watcher thread too, so `watch` never
+    lists a directory itself.
+    """
+
+    def __init__(self, on_change: Callable[[list[Change]], None],
+                 poll_interval: float = 2.0, batch_delay: float = 0.05,
+                 use_inotify: bool = True):
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.batch_delay = batch_delay
+        self._fd: int | None = None
+        if use_inotify and INOTIFY_AVAILABLE:
+            fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+        self._wds: dict[int, set[str]] = {}
+        self._watches: dict[str, int] = {}
+        # Polled directory -> (mtime_ns, {name: is_dir}), None while
+        # unreadable, or _PENDING until its first listing
+        self._polled: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        # A full pipe already means a wake-up is pending
+        os.set_blocking(self._wake_w, False)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fs-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        with contextlib.suppress(BlockingIOError):
+            os.write(self._wake_w, b"\0")
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def watch(self, path: str | os.PathLike) -> None:
+        path = os.fspath(path)
+        with self._lock:
+            if path in self._watches or path in self._polled:
+                return
+            if self._fd is not None:
+                wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+                if wd >= 0:
+                    # Two paths to one directory (via a symlink) share a watch
+                    self._wds.setdefault(wd, set()).add(path)
+                    self._watches[path] = wd
+                    return
+            self._polled[path] = _PENDING
+        # Have the watcher thread take the first listing now
+        if not self._stop.is_set():
+            with contextlib.suppress(OSError):
+                os.write(self._wake_w, b"\0")
+
+    def unwatch(self, path: str | os.PathLike) -> None:
+        path = os.fspath(path)
+        with self._lock:
+            self._polled.pop(path, None)
+            wd = self._watches.pop(path, None)
+            if wd is None:
+                return
+            paths = self._wds.get(wd, set())
+            paths.discard(path)
+            if not paths:
+                self._wds.pop(wd, None)
+                if self._fd is not None:
+                    _libc.inotify_rm_watch(self._fd, wd)
+
+    def clear(self) -> None:
+        for path in self.watched():
+            self.unwatch(path)
+
+    def watched(self) -> list[str]:
+        with self._lock:
+            return [*self._watches, *self._polled]
+
+    def _run(self) -> None:
+        last_poll = time.monotonic()
+        while not self._stop.is_set():
+            sources = [self._wake_r] if self._fd is None else [self._fd, self._wake_r]
+            ready, _, _ = select.select(sources, [], [], self.poll_interval)
+            if self._stop.is_set():
+                return
+            changes: list[Change] = []
+            if self._wake_r in ready:
+                os.read(self._wake_r, 4096)
+                self._poll(pending_only=True)
+            if self._fd is not None and self._fd in ready:
+                # Let the rest of a burst arrive so it's handled as one batch
+                time.sleep(self.batch_delay)
+                changes += self._read_events()
+            if time.monotonic() - last_poll >= self.poll_interval:
+                last_poll = time.monotonic()
+                changes += self._poll()
+            if changes:
+                try:
+                    self.on_change(changes)
+                except Exception:
+                    pass
+
+    def _read_events(self) -> list[Change]:
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                return []
+            if not chunk:
+                break
+            data += chunk
+
+        changes: list[Change] = []
+        moved_from: dict[int, Change] = {}
+        offset = 0
+        with self._lock:
+            while offset + _EVENT.size <= len(data):
+                wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+                raw = data[offset + _EVENT.size: offset + _EVENT.size + length]
+                offset += _EVENT.size + length
+                name = os.fsdecode(raw.rstrip(b"\0"))
+                if mask & IN_Q_OVERFLOW:
+                    changes += [Change("rescan", path) for path in self._watches]
+                    continue
+                if mask & IN_IGNORED:
+                    # The directory is gone (or unwatched); its parent reports the removal
+                    for path in self._wds.pop(wd, ()):
+                        self._watches.pop(path, None)
+                    continue
+                is_dir = bool(mask & IN_ISDIR)
+                for directory in self._wds.get(wd, ()):
+                    if mask & IN_CREATE:
+                        changes.append(Change("created", directory, name, is_dir))
+                    elif mask & IN_DELETE:
+                        changes.append(Change("removed", directory, name, is_dir))
+                    elif mask & IN_MOVED_FROM:
+                        moved_from[cookie] = Change("removed", directory, name, is_dir)
+                    elif mask & IN_MOVED_TO:
+                        source = moved_from.pop(cookie, None)
+                        if source is None:
+                            changes.append(Change("created", directory, name, is_dir))
+                        else:
+                            changes.append(Change("renamed", source.directory, source.name, is_dir,
+                                                  directory, name))
+        # Moved out of every watched directory
+        changes += moved_from.values()
+        return changes
+
+    @staticmethod
+    def _snapshot(path: str) -> tuple[int, dict[str, bool]] | None:
+        listing = list_dir(path)
+        if listing is None:
+            return None
+        entries = dict.fromkeys(listing.files, False)
+        entries.update(dict.fromkeys(listing.dirs, True))
+        return listing.mtime_ns, entries
+
+    def _poll(self, pending_only: bool = False) -> list[Change]:
+        """
+        Re-list polled directories whose mtime changed and diff them.
+        Directories without a first listing get one, with no changes
+        reported for them.
+        """
+        with self._lock:
+            polled = [(path, before) for path, before in self._polled.items()
+                      if not pending_only or before is _PENDING]
+        changes: list[Change] = []
+        for path, before in polled:
+            if before is _PENDING:
+                first = self._snapshot(path)
+                with self._lock:
+                    if self._polled.get(path) is _PENDING:
+                        self._polled[path] = first
+                continue
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if before is not None and before[0] == mtime_ns:
+                continue
+            after = self._snapshot(path)
+            if after is None:
+                continue
+            with self._lock:
+                if path not in self._polled:
+                    continue
+                self._polled[path] = after
+            old = before[1] if before is not None else {}
+            changes += [Change("removed", path, name, is_dir)
+                        for name, is_dir in old.items() if name not in after[1]]
+            changes += [Change("created", path, name, is_dir)
+                        for name, is_dir in after[1].items() if name not in old]
+        return changes
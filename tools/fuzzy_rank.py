@@ -0,0 +1,212 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, chain, count, groupby
+from operator import itemgetter
+from typing import Callable, Iterable
+
+from rapidfuzz import fuzz, process, utils
+
+_process = utils.default_process
+
+
+def match_key(name: str) -> str:
+    """
+    Processed, token-sorted form of `name`. Plain `ratio` between two keys
+    equals `token_sort_ratio(a, b, processor=default_process)` between the
+    original strings; rapidfuzz 3 does not process by default, so without
+    that processor the two differ. Keys are computed once per candidate
+    instead of once per comparison.
+    """
+    return " ".join(sorted(_process(name).split()))
+
+
+class FuzzyRanker:
+    """
+    Score filenames against a query in large batches and keep only the
+    best `limit` matches.
+
+    Candidates are buffered and scored `batch_size` at a time with
+    rapidfuzz's native `process.extract`, then merged into a bounded
+    min-heap. `top()` returns
+    the survivors sorted best-first, so a query that matches 200k files
+    still yields at most `limit` rows.
+    """
+
+    def __init__(self, query: str, threshold: int = 50,
+                 limit: int = 500, batch_size: int = 4096):
+        self.query = query
+        self.threshold = threshold
+        self.limit = limit
+        self.batch_size = batch_size
+        self.matched = 0
+        self.version = 0    # bumped whenever the top-K set changes
+        self._heap: list[tuple[float, int, str, str]] = []
+        self._seq = count()
+        self._names: list[str] = []
+        self._dirs: list[str] = []
+
+    def add(self, dirpath: str, names: list[str]) -> None:
+        """Queue `names` (all living in `dirpath`) for scoring."""
+        self._names.extend(names)
+        self._dirs.extend([dirpath] * len(names))
+        if len(self._names) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Score everything queued so far."""
+        names, dirs = self._names, self._dirs
+        if not names:
+            return
+        self._names, self._dirs = [], []
+
+        if not self.query:
+            # Blank query: everything matches equally, keep the first `limit`
+            self.matched += len(names)
+            for name, dirpath in zip(names, dirs):
+                if len(self._heap) >= self.limit:
+                    break
+                self._push(100.0, dirpath, name)
+            return
+
+        hits = process.extract(self.query, names,
+                               scorer=fuzz.token_sort_ratio,
+                               processor=utils.default_process,
+                               score_cutoff=self.threshold,
+                               limit=None)
+        for _, score, idx in hits:
+            self.matched += 1
+            self._push(score, dirs[idx], names[idx])
+
+    def _push(self, score: float, dirpath: str, name: str) -> None:
+        # Ties keep the earlier candidate: a lower (negated) sequence number wins
+        entry = (score, -next(self._seq), dirpath, name)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+            self.version += 1
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+            self.version += 1
+
+    def top(self) -> list[tuple[float, str, str]]:
+        """Return (score, dirpath, name) for the best matches, best first."""
+        return [(score, dirpath, name)
+                for score, _, dirpath, name in sorted(self._heap, reverse=True)]
+
+
+class CandidateSet:
+    """
+    In-memory candidate list for one (root, extensions) pair: parallel
+    lists of directory and filename, plus one precomputed match key per
+    distinct name. Kept between keystrokes so search-as-you-type only pays
+    for scoring.
+
+    Keys are sorted by length. `ratio(q, k) >= t` needs
+    `200 * min(len(q), len(k)) >= t * (len(q) + len(k))`, so a query only
+    scores one contiguous slice of them.
+    """
+
+    def __init__(self,
+                 listings: Iterable[tuple[str, list[str]]],
+                 exts: tuple[str, ...] = (),
+                 generation: int = 0,
+                 cancelled: Callable[[], bool] | None = None):
+        self.generation = generation
+        self.complete = False
+        self.dirs: list[str] = []
+        self.names: list[str] = []
+        key_ids: dict[str, int] = {}
+        row_keys = array("L")
+        for dirpath, filenames in listings:
+            if cancelled is not None and cancelled():
+                return
+            if exts:
+                filenames = [f for f in filenames if f.lower().endswith(exts)]
+            self.dirs.extend([dirpath] * len(filenames))
+            self.names.extend(filenames)
+            row_keys.extend(key_ids.setdefault(key, len(key_ids))
+                            for key in map(match_key, filenames))
+
+        # Unique keys sorted by length. Joining and splitting copies them
+        # into adjacent memory, which scores much faster than keys
+        # scattered across the heap.
+        keys = sorted(key_ids, key=len)
+        self.keys: list[str] = "\0".join(keys).split("\0") if keys else []
+        lengths = [len(key) for key in self.keys]
+        max_len = lengths[-1] if lengths else 0
+        self._by_length = [bisect_left(lengths, n) for n in range(max_len + 2)]
+
+        # Rows grouped by key: rows of key `k` are
+        # `_rows[_row_start[k]:_row_start[k + 1]]`, in list order
+        position = {key: k for k, key in enumerate(self.keys)}
+        key_pos = array("L", (position[key] for key in key_ids))
+        counts = [0] * (len(self.keys) + 1)
+        for kid in row_keys:
+            counts[key_pos[kid] + 1] += 1
+        self._row_start = array("L", accumulate(counts))
+        fill = array("L", self._row_start)
+        self._rows = array("L", bytes(len(row_keys) * self._row_start.itemsize))
+        for row, kid in enumerate(row_keys):
+            k = key_pos[kid]
+            self._rows[fill[k]] = row
+            fill[k] += 1
+
+        self.complete = True
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rank(self, query: str, threshold: int = 50,
+             limit: int = 500) -> tuple[list[tuple[float, str, str]], int]:
+        """
+        Score every candidate against `query` in one pass. Returns the best
+        `limit` matches as (score, dirpath, name), best first, and the
+        total number of matches.
+        """
+        if not query:
+            top = [(100.0, d, n) for d, n in zip(self.dirs[:limit], self.names[:limit])]
+            return top, len(self.names)
+
+        qkey = match_key(query)
+        if not qkey:
+            return [], 0
+        lq = len(qkey)
+        lengths = range(len(self._by_length) - 1)
+        reach = [n for n in lengths if 200 * min(lq, n) >= threshold * (lq + n)]
+        if not reach:
+            return [], 0
+        lo, hi = self._by_length[reach[0]], self._by_length[reach[-1] + 1]
+        keys = self.keys[lo:hi]
+        # Sorted best-first by rapidfuzz; ties keep key order
+        hits = process.extract(qkey, keys, scorer=fuzz.ratio,
+                               score_cutoff=threshold, limit=None)
+
+        start, rows = self._row_start, self._rows
+        matched = sum(start[lo + i + 1] - start[lo + i] for _, _, i in hits)
+        # A key may stand for several rows; equal scores keep list order
+        top: list[tuple[float, str, str]] = []
+        for score, group in groupby(hits, key=itemgetter(1)):
+            same = sorted(chain.from_iterable(rows[start[lo + i]:start[lo + i + 1]]
+                                              for _, _, i in group))
+            top.extend((score, self.dirs[row], self.names[row])
+                       for row in same[:limit - len(top)])
+            if len(top) >= limit:
+                break
+        return top, matched
+
+
+def rerank(query: str, rows: list[tuple[float, str, str]],
+           threshold: int = 50) -> list[tuple[float, str, str]]:
+    """
+    Re-score an already ranked (score, dirpath, name) list for a new query.
+    Cheap enough for the UI thread; used to narrow the visible results
+    instantly while the full pass runs.
+    """
+    qkey = match_key(query)
+    out = []
+    for _, dirpath, name in rows:
+        score = fuzz.ratio(qkey, match_key(name)) if query else 100.0
+        if score >= threshold:
+            out.append((score, dirpath, name))
+    out.sort(key=lambda row: -row[0])
+    return out
@@ -1,58 +1,350 @@
 import os
-from fuzzywuzzy import fuzz
+import re
+import threading
+import time
+from textual import work
+from textual.containers import Horizontal
 from textual.screen import Screen
-from textual.widgets import Input, Button, ListView, ListItem, Static
+from textual.widgets import Input, Button, Checkbox, Static
 from textual.reactive import reactive
+from textual.timer import Timer
+from textual.worker import Worker, get_current_worker
+
+from .content_search import ContentSearcher
+from .file_index import FileIndex
+from .fs_walker import ParallelWalker
+from .fuzzy_rank import CandidateSet, FuzzyRanker, rerank
+from .result_list import ResultList
 
 class FuzzySearchScreen(Screen):
     BINDINGS = [
-        ("escape", "app.pop_screen", "Back"),
+        ("escape", "cancel_or_back", "Cancel/Back"),
         ("enter", "do_search", "Search"),
     ]
 
     threshold: reactive[int] = reactive(50)
 
+    # Ranked results are republished at most this often while searching
+    FLUSH_INTERVAL = 0.5
+    MAX_RESULTS    = 500
+    # Search-as-you-type waits this long after the last keystroke
+    DEBOUNCE       = 0.15
+    # Candidate lists kept in memory, one per (root, extensions) pair
+    MAX_CANDIDATE_SETS = 4
+    # Content search stops once this many matching lines were found
+    MAX_CONTENT_HITS   = 10_000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._candidates: dict[tuple[str, tuple[str, ...]], CandidateSet] = {}
+        self._candidates_lock = threading.Lock()
+        # root -> listings walked so far by a running index build
+        self._building: dict[str, list[tuple[str, list[str]]]] = {}
+        self._shown: list[tuple[float, str, str]] = []
+        self._shown_query = ""
+        self._debounce: Timer | None = None
+
     def compose(self):
         yield Static("🔍  Fuzzy File Search", classes="header")
         yield Input(placeholder="Search query (blank = exact match)", id="query_input")
         yield Input(placeholder="File types (e.g. .py .txt, blank = all)", id="types_input")
         yield Input(placeholder="Root directory (blank = /)", id="root_input")
-        yield Button(label="Search", id="search_btn")
-        yield ListView(id="results_view")
+        with Horizontal(id="search_options"):
+            yield Button(label="Search", id="search_btn")
+            yield Checkbox("Search contents", id="content_toggle")
+            yield Checkbox("Regex", id="regex_toggle")
+        yield Static("", id="search_status")
+        yield ResultList(id="results_view")
 
     async def on_button_pressed(self, event):
         if event.button.id == "search_btn":
-            await self.perform_search()
+            self.perform_search()
+
+    def action_do_search(self):
+        self.perform_search()
+
+    def action_cancel_or_back(self):
+        if self._search_running() or self._building:
+            self.cancel_search()
+            self.cancel_index()
+        else:
+            self.app.pop_screen()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self.perform_search()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        # Any edit invalidates the in-flight search
+        self.cancel_search()
+        if self._debounce is not None:
+            self._debounce.stop()
+            self._debounce = None
+        if event.input.id != "query_input" or self._content_mode():
+            return
+
+        # Narrow what is already on screen right away, then re-rank the
+        # whole candidate list once typing pauses.
+        query = event.value.strip().lower()
+        if self._shown and self._shown_query and query.startswith(self._shown_query):
+            self._render_rows(rerank(query, self._shown, self.threshold))
+        self._debounce = self.set_timer(self.DEBOUNCE, self.perform_search)
 
-    async def action_do_search(self):
-        await self.perform_search()
+    def on_checkbox_changed(self, event: Checkbox.Changed) -> None:
+        self.cancel_search()
 
-    async def perform_search(self):
-        query     = self.query_one("#query_input", Input).value.strip().lower()
+    def on_screen_suspend(self) -> None:
+        self.cancel_search()
+        self.cancel_index()
+
+    def _search_running(self) -> bool:
+        return any(w.group == "search" and w.is_running for w in self.workers)
+
+    def cancel_search(self) -> None:
+        if self._search_running():
+            self.workers.cancel_group(self, "search")
+            self.query_one("#search_status", Static).update("[dim]Search cancelled.[/]")
+
+    def cancel_index(self) -> None:
+        """Stop a running index build; the next search starts it again."""
+        if self._debounce is not None:
+            self._debounce.stop()
+            self._debounce = None
+        self.workers.cancel_group(self, "index")
+        self._building.clear()
+
+    def _root(self) -> str:
+        return self.query_one("#root_input", Input).value.strip() or "/"
+
+    def _content_mode(self) -> bool:
+        return self.query_one("#content_toggle", Checkbox).value
+
+    def perform_search(self):
+        query     = self.query_one("#query_input", Input).value.strip()
         types_txt = self.query_one("#types_input",  Input).value.strip()
-        root_val  = self.query_one("#root_input",   Input).value.strip()
-        root      = root_val or "/"
-
-        exts = types_txt.split() if types_txt else []
-        view = self.query_one("#results_view", ListView)
-        view.clear()
-
-        for dirpath, _, filenames in os.walk(root):
-            for fname in filenames:
-                if exts and not any(fname.lower().endswith(ext.lower()) for ext in exts):
-                    continue
-                full = os.path.join(dirpath, fname)
-                score = fuzz.token_sort_ratio(query, fname.lower()) if query else 100
-                if score >= self.threshold:
-                    item = ListItem(Static(f"{fname} — {dirpath}"))
-                    item.data = full
-                    view.append(item)
-
-        if not view.children:
-            view.append(ListItem(Static("[dim]No matches found.[/]")))
-
-    async def on_list_view_selected(self, event):
-        selected = event.item.data
+        root      = self._root()
+
+        exts = tuple(ext.lower() for ext in types_txt.split()) if types_txt else ()
+        status = self.query_one("#search_status", Static)
+        if self._content_mode():
+            if not query:
+                status.update("[dim]Enter text to search for.[/]")
+                return
+            regex = self.query_one("#regex_toggle", Checkbox).value
+            self.query_one("#results_view", ResultList).clear()
+            status.update("[dim]Searching contents…[/]")
+            self._grep(query, regex, exts, root)
+        else:
+            status.update("[dim]Searching…[/]")
+            index = FileIndex.for_root(root)
+            if not index.ready and index.root not in self._building:
+                self._building[index.root] = []
+                self._build_index(index.root)
+            self._search(query.lower(), exts, root)
+
+    def _candidate_set(self, index: FileIndex, exts: tuple[str, ...]) -> CandidateSet | None:
+        """
+        Return the cached candidate list for (root, exts), rebuilding it if
+        the index changed. A rebuild runs to completion even if the search
+        that started it is cancelled, so typing cannot starve it; searches
+        arriving meanwhile wait for it instead of starting their own.
+        """
+        key = (index.root, exts)
+        with self._candidates_lock:
+            cands = self._candidates.get(key)
+            if cands is not None and cands.generation == index.generation:
+                return cands
+            cands = CandidateSet(index.listings(), exts, index.generation,
+                                 cancelled=lambda: not self.is_attached)
+            if not cands.complete:
+                return None
+            self._candidates.pop(key, None)
+            while len(self._candidates) >= self.MAX_CANDIDATE_SETS:
+                self._candidates.pop(next(iter(self._candidates)))
+            self._candidates[key] = cands
+            return cands
+
+    @work(thread=True, exclusive=True, group="index")
+    def _build_index(self, root: str) -> None:
+        """
+        Load or build the index for `root` on its own worker, so editing
+        the query only cancels ranking. Walked directories are appended to
+        `_building[root]` for searches to rank while the walk goes on.
+        """
+        worker = get_current_worker()
+        found = self._building.setdefault(root, [])
+        try:
+            FileIndex.for_root(root).ensure_loaded(
+                on_dir=lambda dirpath, filenames: found.append((dirpath, filenames)),
+                cancelled=lambda: worker.is_cancelled,
+            )
+        finally:
+            if self._building.get(root) is found:
+                del self._building[root]
+
+    @work(thread=True, exclusive=True, group="search")
+    def _search(self, query: str, exts: tuple[str, ...], root: str) -> None:
+        """
+        Rank filenames on a worker thread. Cancelled by a new search, an
+        edit, or Esc.
+
+        While a root's index is being built, the listings walked so far are
+        ranked and the current top matches streamed as more arrive. Once
+        the index is ready, the cached candidate list for (root, exts) is
+        ranked in a single pass.
+        """
+        worker = get_current_worker()
+        index = FileIndex.for_root(root)
+        found = self._building.get(index.root)
+        if found is not None:
+            ranker = FuzzyRanker(query, self.threshold, limit=self.MAX_RESULTS)
+            scanned = 0
+            seen = 0
+            shown_version = -1
+            last_flush = time.monotonic()
+
+            def publish(final: bool = False) -> None:
+                nonlocal shown_version, last_flush
+                ranker.flush()
+                last_flush = time.monotonic()
+                top = None
+                if ranker.version != shown_version:
+                    shown_version = ranker.version
+                    top = ranker.top()
+                self.app.call_from_thread(self._show_results, worker, query, top,
+                                          scanned, ranker.matched, final)
+
+            while True:
+                # Check before reading, so a finished build is read to the end
+                done = self._building.get(index.root) is not found
+                batch = found[seen:]
+                seen += len(batch)
+                for dirpath, filenames in batch:
+                    if worker.is_cancelled:
+                        return
+                    scanned += len(filenames)
+                    if exts:
+                        filenames = [f for f in filenames if f.lower().endswith(exts)]
+                    if filenames:
+                        ranker.add(dirpath, filenames)
+                    if time.monotonic() - last_flush >= self.FLUSH_INTERVAL:
+                        publish()
+                if done or worker.is_cancelled:
+                    break
+                if not batch:
+                    time.sleep(self.FLUSH_INTERVAL / 10)
+            if worker.is_cancelled:
+                return
+            if seen or not index.ready:
+                # The walk was ranked as it went (or was cut short)
+                publish(final=True)
+                return
+
+        # Rank the in-memory candidates; stale subtrees are rescanned in the
+        # background and picked up by a later search.
+        index.refresh_in_background()
+        start = time.perf_counter()
+        cands = self._candidate_set(index, exts)
+        if cands is None or worker.is_cancelled:
+            return
+        top, matched = cands.rank(query, self.threshold, self.MAX_RESULTS)
+        if worker.is_cancelled:
+            return
+        elapsed = time.perf_counter() - start
+        self.app.call_from_thread(self._show_results, worker, query, top,
+                                  len(cands), matched, True, elapsed)
+
+    @work(thread=True, exclusive=True, group="search")
+    def _grep(self, query: str, regex: bool, exts: tuple[str, ...], root: str) -> None:
+        """
+        Search file contents under `root` on the shared process pool and
+        stream matching lines to the UI as they are found.
+        """
+        worker = get_current_worker()
+        cancelled = lambda: worker.is_cancelled
+
+        index = FileIndex.for_root(root)
+        if index.ready:
+            listings = index.listings()
+        else:
+            listings = ((l.path, l.files) for l in ParallelWalker().walk(root, cancelled=cancelled))
+
+        def paths():
+            for dirpath, filenames in listings:
+                for fname in filenames:
+                    if not exts or fname.lower().endswith(exts):
+                        yield os.path.join(dirpath, fname)
+
+        scanned = 0
+        matched = 0
+        pending = []
+        last_flush = time.monotonic()
+        try:
+            for scanned, hits in ContentSearcher().search(paths(), query, regex, cancelled):
+                hits = hits[:self.MAX_CONTENT_HITS - matched]
+                matched += len(hits)
+                pending.extend(hits)
+                if matched >= self.MAX_CONTENT_HITS:
+                    break
+                if time.monotonic() - last_flush >= self.FLUSH_INTERVAL / 2:
+                    self.app.call_from_thread(self._show_hits, worker, pending, scanned, matched, False)
+                    pending, last_flush = [], time.monotonic()
+        except re.error as e:
+            self.app.call_from_thread(self._show_status, worker, f"[red]Invalid regex: {e}[/]")
+            return
+        except Exception as e:
+            self.app.call_from_thread(self._show_status, worker, f"[red]Content search failed: {e}[/]")
+            return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._show_hits, worker, pending, scanned, matched, True)
+
+    def _show_hits(self, worker: Worker, hits: list, scanned: int,
+                   matched: int, final: bool) -> None:
+        if worker.is_cancelled:
+            return
+        view = self.query_one("#results_view", ResultList)
+        view.empty_message = "No matches found."
+        view.append_hits(hits)
+        status = f"{scanned:,} files scanned / {matched:,} matching lines"
+        if matched >= self.MAX_CONTENT_HITS:
+            status += " (limit reached)"
+        self.query_one("#search_status", Static).update(
+            status if final else f"[dim]{status}…[/]"
+        )
+
+    def _show_status(self, worker: Worker, message: str) -> None:
+        if not worker.is_cancelled:
+            self.query_one("#search_status", Static).update(message)
+
+    def _show_results(self, worker: Worker, query: str,
+                      top: list[tuple[float, str, str]] | None,
+                      scanned: int, matched: int, final: bool,
+                      elapsed: float | None = None) -> None:
+        if worker.is_cancelled:
+            return
+        if top is not None:
+            self._shown, self._shown_query = top, query
+            if top or final:
+                self._render_rows(top)
+        elif final and not matched:
+            self._render_rows([])
+
+        status = f"{scanned:,} scanned / {matched:,} matched"
+        if matched > self.MAX_RESULTS:
+            status += f" (top {self.MAX_RESULTS} shown)"
+        if elapsed is not None:
+            status += f" in {elapsed * 1000:.0f} ms"
+        self.query_one("#search_status", Static).update(
+            status if final else f"[dim]{status}…[/]"
+        )
+
+    def _render_rows(self, rows: list[tuple[float, str, str]]) -> None:
+        view = self.query_one("#results_view", ResultList)
+        view.empty_message = "No matches found."
+        view.set_results(
+            (score, os.path.join(dirpath, fname)) for score, dirpath, fname in rows
+        )
+
+    async def on_result_list_selected(self, event: ResultList.Selected):
         await self.app.pop_screen()
         # <-- call the App's method directly
-        await self.app.jump_to_path(selected)
+        await self.app.jump_to_path(event.path, line=event.line)
@@ -1,17 +1,88 @@
+import io
 from pathlib import Path
 from rich_pixels import Pixels
 from rich.console import RenderableType
-from PIL import Image
+from PIL import ExifTags, Image
+
+from .ascii_art import DEFAULT_ASCII_CHARS, image_to_ascii
+from .thumbnail_cache import ThumbnailCache
+
+# Refuse to fully decode anything larger; a 100x50 preview never needs it
+MAX_PREVIEW_PIXELS = 50_000_000
+
+
+def _exif_thumbnail(img: Image.Image, size: tuple[int, int]) -> Image.Image | None:
+    """
+    The thumbnail embedded in a JPEG's EXIF data, if it is big enough for
+    `size` and has the same aspect ratio as the photo (no letterboxing).
+    """
+    try:
+        ifd1 = img.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset = ifd1.get(ExifTags.Base.JpegIFOffset)
+        length = ifd1.get(ExifTags.Base.JpegIFByteCount)
+        raw = img.info.get("exif")
+        if not offset or not length or not raw:
+            return None
+        # Offsets count from the TIFF header, after the "Exif\0\0" marker
+        thumb = Image.open(io.BytesIO(raw[6 + offset:6 + offset + length]))
+        scale = min(size[0] / img.width, size[1] / img.height, 1)
+        if thumb.width < int(img.width * scale) or thumb.height < int(img.height * scale):
+            return None
+        if abs(thumb.width / thumb.height - img.width / img.height) > 0.02:
+            return None
+        thumb.load()
+        return thumb
+    except Exception:
+        return None
+
+
+def open_scaled(path: str | Path, max_width: int, max_height: int) -> Image.Image:
+    """
+    Open an image already scaled to fit (max_width x max_height), decoding
+    as little of it as possible: the embedded EXIF thumbnail or DCT-domain
+    downscaling (`draft`) for JPEG, resolution levels for JPEG 2000. Raises
+    ValueError for images over MAX_PREVIEW_PIXELS that can't be decoded at
+    a reduced size.
+    """
+    size = (max_width, max_height)
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            thumb = _exif_thumbnail(img, size)
+            if thumb is not None:
+                img = thumb
+            else:
+                img.draft(img.mode, size)
+        elif img.format == "JPEG2000":
+            level = 0
+            while (img.width >> (level + 1) >= max_width
+                   and img.height >> (level + 1) >= max_height):
+                level += 1
+            img.reduce = level
+            # Sizes only reflect the reduction once decoded
+            img.load()
+        if img.width * img.height > MAX_PREVIEW_PIXELS:
+            raise ValueError(f"Image too large to preview ({img.width}x{img.height})")
+        img.thumbnail(size)
+        return img.copy()
 
 class ImagePreviewer:
     """
     Render image files in terminal via `rich_pixels` for color output,
     with an ASCII-art fallback.
     """
-    def __init__(self, max_width: int = 1000, max_height: int = 1000, ascii_chars: str = "@%#*+=-:. "):
+    def __init__(self, max_width: int = 1000, max_height: int = 1000, ascii_chars: str = DEFAULT_ASCII_CHARS,
+                 thumbnails: ThumbnailCache | None = None):
         self.max_width = max_width
         self.max_height = max_height
         self.ascii_chars = ascii_chars
+        self.thumbnails = thumbnails
+
+    def _scaled(self, path: Path) -> Image.Image:
+        """The image scaled to fit max dimensions, from the thumbnail cache when possible."""
+        build = lambda: open_scaled(path, self.max_width, self.max_height)
+        if self.thumbnails is None:
+            return build()
+        return self.thumbnails.image(path, ("image", self.max_width, self.max_height), build)
 
     def rich_preview(self, file_path: str) -> RenderableType:
         """
@@ -20,11 +91,7 @@ class ImagePreviewer:
         path = Path(file_path)
         if not path.exists() or not path.is_file():
             raise FileNotFoundError(f"Image not found: {file_path}")
-        with Image.open(path) as img:
-            # Resize image preserving aspect ratio
-            img.thumbnail((self.max_width, self.max_height))
-            pixels = Pixels.from_image(img)
-        return pixels
+        return Pixels.from_image(self._scaled(path))
 
     def ascii_preview(self, file_path: str) -> str:
         """
@@ -35,14 +102,4 @@ class ImagePreviewer:
         if not path.exists() or not path.is_file():
             raise FileNotFoundError(f"Image not found: {file_path}")
 
-        img = Image.open(path).convert("L")
-        img.thumbnail((self.max_width, self.max_height))
-        output = []
-        for y in range(img.height):
-            row = []
-            for x in range(img.width):
-                pixel = img.getpixel((x, y))
-                idx = pixel * (len(self.ascii_chars) - 1) // 255
-                row.append(self.ascii_chars[idx])
-            output.append("".join(row))
-        return "\n".join(output)
\ No newline at end of file
+        return image_to_ascii(self._scaled(path), self.max_width, self.max_height, self.ascii_chars)
\ No newline at end of file
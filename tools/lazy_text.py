@@ -0,0 +1,223 @@
+import os
+import mmap
+import threading
+from array import array
+
+from .content_search import SNIFF_SIZE, is_binary
+
+# One byte offset is remembered for every CHECKPOINT lines
+CHECKPOINT = 64
+# Lines longer than this are split so one giant line can't stall a scan
+MAX_LINE_BYTES = 64 * 1024
+# Guess used for the line-count estimate before anything is indexed
+AVG_LINE_BYTES = 80
+# Bytes mapped at a time. Mapping whole files fails for multi-gigabyte
+# logs on 32-bit systems, which lack the address space.
+WINDOW = 16 * 1024 * 1024
+
+
+class _Window:
+    """A read-only map of part of a file, moved along as reads need it."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.mm: mmap.mmap | None = None
+        self.base = 0
+
+    def cover(self, pos: int, end: int, size: int) -> mmap.mmap:
+        """Map at least bytes [pos, end) of a `size`-byte file."""
+        mm = self.mm
+        if mm is None or pos < self.base or end > self.base + len(mm):
+            self.close()
+            base = pos - pos % mmap.ALLOCATIONGRANULARITY
+            length = min(max(WINDOW, end - base), size - base)
+            self.mm = mm = mmap.mmap(self._fh.fileno(), length,
+                                     access=mmap.ACCESS_READ, offset=base)
+            self.base = base
+        return mm
+
+    def close(self) -> None:
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+
+class LazyTextFile:
+    """
+    Read-only, memory-mapped view of a text file addressed by line number.
+    Only a `WINDOW` around the scan position and another around the lines
+    being read are mapped at any time.
+
+    Line offsets are indexed lazily: only as far as the furthest line
+    asked for, and only one offset per `CHECKPOINT` lines is kept, so
+    opening a file is constant time and the index stays small even for
+    multi-gigabyte logs. Reading a line walks forward from the nearest
+    checkpoint. Until the whole file has been scanned, `line_count` is an
+    estimate extrapolated from the part already seen.
+
+    For following a growing log, `tail` anchors line 0 near the end of the
+    file and `refresh` picks up newly appended bytes, so the cost of keeping
+    up is proportional to the new data rather than the file size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = open(path, "rb")
+        st = os.fstat(self._fh.fileno())
+        self.inode = st.st_ino
+        self.mtime_ns = st.st_mtime_ns
+        self.binary = is_binary(self._fh.read(SNIFF_SIZE))
+        self.size = 0 if self.binary else st.st_size
+        # One window follows the indexer, the other the lines on screen
+        self._scan_view = _Window(self._fh)
+        self._read_view = _Window(self._fh)
+        self._reset_index(0)
+
+    def _reset_index(self, start: int) -> None:
+        # Byte offset of line 0; non-zero when anchored near the end by `tail`
+        self.start = start
+        self._marks = array("Q", [start])
+        # Start offset and number of the first line not yet scanned
+        self._scan_pos = start
+        self._scan_line = 0
+        self._last_start = start
+        self.complete = start >= self.size
+
+    def tail(self, nbytes: int) -> None:
+        """Re-anchor line 0 at the first full line in the last `nbytes` of the file."""
+        with self._lock:
+            start = 0
+            if self.size > nbytes:
+                start = self._find_newline(self.size - nbytes, self.size, self._scan_view) + 1 or self.size
+            self._reset_index(start)
+
+    def refresh(self) -> str:
+        """
+        Pick up changes to a file that is being followed. Returns "grown"
+        when bytes were appended: only the new bytes will be scanned. Returns "replaced" when the file was
+        truncated or rotated (a different inode now lives at `path`), and
+        "" when nothing changed.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # Rotated away and not recreated yet
+            return ""
+        if st.st_ino != self.inode or st.st_size < self.size:
+            return "replaced"
+        if st.st_size == self.size or self.binary:
+            return ""
+        with self._lock:
+            if self._fh.closed:
+                return ""
+            # An unterminated last line is still being written; scan it again
+            if (self.size and self._scan_pos == self.size
+                    and self._read(self.size - 1, self.size, self._scan_view) != b"\n"):
+                if self._scan_line % CHECKPOINT == 0:
+                    self._marks.pop()
+                self._scan_line -= 1
+                self._scan_pos = self._last_start
+            self.size = st.st_size
+            self.mtime_ns = st.st_mtime_ns
+            self.complete = False
+        return "grown"
+
+    def close(self) -> None:
+        with self._lock:
+            self._scan_view.close()
+            self._read_view.close()
+            self._fh.close()
+            self.complete = True
+
+    def _read(self, pos: int, end: int, view: _Window) -> bytes:
+        mm = view.cover(pos, end, self.size)
+        return mm[pos - view.base:end - view.base]
+
+    def _find_newline(self, pos: int, end: int, view: _Window) -> int:
+        """Offset of the first newline in [pos, end), or -1."""
+        while pos < end:
+            stop = min(end, pos + WINDOW)
+            mm = view.cover(pos, stop, self.size)
+            found = mm.find(b"\n", pos - view.base, stop - view.base)
+            if found != -1:
+                return view.base + found
+            pos = stop
+        return -1
+
+    def _next_line(self, pos: int, view: _Window) -> int:
+        """Offset just past the line starting at `pos`."""
+        limit = min(pos + MAX_LINE_BYTES, self.size)
+        mm, base = view.mm, view.base
+        if mm is None or pos < base or limit > base + len(mm):
+            mm, base = view.cover(pos, limit, self.size), view.base
+        end = mm.find(b"\n", pos - base, limit - base)
+        return limit if end == -1 else base + end + 1
+
+    @property
+    def indexed_lines(self) -> int:
+        return self._scan_line
+
+    @property
+    def line_count(self) -> int:
+        if self.complete:
+            return self._scan_line
+        if self._scan_line:
+            avg = max(1, (self._scan_pos - self.start) // self._scan_line)
+        else:
+            avg = AVG_LINE_BYTES
+        return self._scan_line + -(-(self.size - self._scan_pos) // avg)
+
+    def index_to(self, line: int, budget: int | None = None) -> bool:
+        """
+        Scan forward until `line` is indexed or the end of the file is
+        reached. Stops early after `budget` bytes; returns True once
+        `line` is available (or can't exist).
+        """
+        with self._lock:
+            if self._fh.closed:
+                return True
+            pos, n = self._scan_pos, self._scan_line
+            stop = self.size if budget is None else min(self.size, pos + budget)
+            size, marks, view = self.size, self._marks, self._scan_view
+            while n <= line and pos < stop:
+                mm = view.cover(pos, min(pos + MAX_LINE_BYTES, size), size)
+                base, find = view.base, mm.find
+                # Scan in window-relative offsets while a whole line's
+                # search range is mapped; the first line always is
+                end = base + len(mm)
+                if end < size:
+                    end -= MAX_LINE_BYTES
+                rel, hi = pos - base, max(min(end, stop), pos + 1) - base
+                while n <= line and rel < hi:
+                    self._last_start = base + rel
+                    nl = find(b"\n", rel, rel + MAX_LINE_BYTES)
+                    rel = min(rel + MAX_LINE_BYTES, size - base) if nl == -1 else nl + 1
+                    n += 1
+                    if n % CHECKPOINT == 0:
+                        marks.append(base + rel)
+                pos = base + rel
+            self._scan_pos, self._scan_line = pos, n
+            if pos >= self.size:
+                self.complete = True
+            return n > line or self.complete
+
+    def lines(self, start: int, count: int) -> list[str]:
+        """Return up to `count` lines starting at `start` (0-based), already indexed."""
+        with self._lock:
+            if self._fh.closed:
+                return []
+            end = min(start + count, self._scan_line)
+            if start >= end:
+                return []
+            mark = start // CHECKPOINT
+            pos = self._marks[mark]
+            view = self._read_view
+            for _ in range(start - mark * CHECKPOINT):
+                pos = self._next_line(pos, view)
+            out = []
+            for _ in range(end - start):
+                nxt = self._next_line(pos, view)
+                out.append(self._read(pos, nxt, view).decode("utf-8", "replace").rstrip("\r\n"))
+                pos = nxt
+            return out
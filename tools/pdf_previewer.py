@@ -1,34 +1,167 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from pdfminer.high_level import extract_text
+from typing import Iterator
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
 from rich.console import RenderableType
 from rich.markdown import Markdown
 
+from .thumbnail_cache import ThumbnailCache
+
+
+class LazyPDF:
+    """
+    An open PDF whose pages are located and converted to text only on demand.
+
+    Opening parses just the trailer and cross-reference table. The page
+    tree is walked only as far as the highest page asked for, and each
+    page's content stream is interpreted once; fonts and other resources
+    are shared between pages.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self.mtime_ns = os.stat(self.path).st_mtime_ns
+        self._fh = open(self.path, "rb")
+        try:
+            self._doc = PDFDocument(PDFParser(self._fh))
+        except Exception:
+            self._fh.close()
+            raise
+        self._page_iter = PDFPage.create_pages(self._doc)
+        self._pages: list[PDFPage] = []
+        self._text: dict[int, str] = {}
+        self._resources = PDFResourceManager(caching=True)
+        self._lock = threading.Lock()
+        self.page_count = self._declared_count()
+        # Checkouts by PDFPreviewer; an evicted document is closed when the last one ends
+        self.users = 0
+        self.evicted = False
+
+    def _declared_count(self) -> int | None:
+        # /Count on the page tree root; walking the tree is the fallback
+        try:
+            count = resolve1(resolve1(self._doc.catalog["Pages"])["Count"])
+        except Exception:
+            return None
+        return count if isinstance(count, int) and count > 0 else None
+
+    def _page(self, number: int) -> PDFPage:
+        while len(self._pages) <= number:
+            try:
+                self._pages.append(next(self._page_iter))
+            except StopIteration:
+                self.page_count = len(self._pages)
+                raise IndexError(f"{Path(self.path).name} has only {self.page_count} pages")
+        return self._pages[number]
+
+    def text(self, number: int) -> str:
+        """Text of page `number` (0-based)."""
+        with self._lock:
+            if number not in self._text:
+                out = io.StringIO()
+                device = TextConverter(self._resources, out, laparams=LAParams())
+                try:
+                    PDFPageInterpreter(self._resources, device).process_page(self._page(number))
+                finally:
+                    device.close()
+                self._text[number] = out.getvalue()
+            return self._text[number]
+
+    def close(self) -> None:
+        self._fh.close()
+
+
 class PDFPreviewer:
     """
-    Extracts text from the first page of a PDF and renders it:
+    Extracts text from one page of a PDF at a time and renders it:
      - as a Rich Markdown renderable (rich_preview)
      - as plain text (text_preview)
+
+    The last few documents stay open, so paging through a PDF only
+    interprets the pages actually shown. A document evicted while another
+    thread is reading it is closed once that thread is done with it.
     """
 
-    def __init__(self, max_pages: int = 2, max_chars: int = 5000):
-        self.max_pages = max_pages
+    MAX_OPEN_DOCUMENTS = 4
+
+    def __init__(self, max_chars: int = 5000, thumbnails: ThumbnailCache | None = None):
         self.max_chars = max_chars
+        self.thumbnails = thumbnails
+        self._documents: OrderedDict[str, LazyPDF] = OrderedDict()
+        self._page_counts: dict[str, int | None] = {}
+        self._lock = threading.Lock()
 
-    def rich_preview(self, file_path: str) -> RenderableType:
-        text = self._extract_text(file_path)
-        snippet = text[: self.max_chars]
+    def rich_preview(self, file_path: str, page: int = 0) -> RenderableType:
         # wrap in a markdown code block (so PDF text shows in a scrollable block)
-        md = Markdown(f"```\n{snippet}\n```")
+        md = Markdown(f"{self._header(file_path, page)}\n\n```\n{self.text_preview(file_path, page)}\n```")
         return md
 
-    def text_preview(self, file_path: str) -> str:
-        text = self._extract_text(file_path)
+    def text_preview(self, file_path: str, page: int = 0) -> str:
+        text = self._extract_text(file_path, page)
         return text[: self.max_chars]
 
-    def _extract_text(self, file_path: str) -> str:
-        path = Path(file_path)
-        if not path.exists() or not path.is_file():
+    def page_count(self, file_path: str) -> int | None:
+        """Number of pages, or None if the PDF doesn't declare it and hasn't been read to the end."""
+        with self._checkout(file_path) as doc:
+            count = self._page_counts[doc.path] = doc.page_count
+        return count
+
+    def known_page_count(self, file_path: str) -> int | None:
+        """The page count found by the last preview of `file_path`, without touching the disk."""
+        return self._page_counts.get(os.path.abspath(file_path))
+
+    def _header(self, file_path: str, page: int) -> str:
+        count = self.page_count(file_path)
+        return f"**Page {page + 1}{f' of {count}' if count else ''}**"
+
+    @contextmanager
+    def _checkout(self, file_path: str) -> Iterator[LazyPDF]:
+        """The open document for `file_path`, kept open until the block ends."""
+        path = os.path.abspath(file_path)
+        if not os.path.isfile(path):
             raise FileNotFoundError(f"PDF not found: {file_path}")
-        # extract_text returns a string of all pages; maxpages limits it
-        text = extract_text(str(path), maxpages=self.max_pages)
-        return text or "[No text found on first page]"
+        with self._lock:
+            doc = self._documents.get(path)
+            if doc is not None and doc.mtime_ns != os.stat(path).st_mtime_ns:
+                self._evict(self._documents.pop(path))
+                doc = None
+            if doc is None:
+                doc = self._documents[path] = LazyPDF(path)
+                if len(self._documents) > self.MAX_OPEN_DOCUMENTS:
+                    self._evict(self._documents.popitem(last=False)[1])
+            self._documents.move_to_end(path)
+            doc.users += 1
+        try:
+            yield doc
+        finally:
+            with self._lock:
+                doc.users -= 1
+                if doc.evicted and not doc.users:
+                    doc.close()
+
+    @staticmethod
+    def _evict(doc: LazyPDF) -> None:
+        # Called with self._lock held
+        doc.evicted = True
+        if not doc.users:
+            doc.close()
+
+    def _extract_text(self, file_path: str, page: int) -> str:
+        def build() -> str:
+            with self._checkout(file_path) as doc:
+                return doc.text(page)
+        if self.thumbnails is None:
+            text = build()
+        else:
+            text = self.thumbnails.text(Path(file_path), ("pdf-page", page), build)
+        return text.strip() or f"[No text found on page {page + 1}]"
@@ -0,0 +1,88 @@
+import os
+import time
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+# Nice value for prefetch threads (and the ffmpeg processes they start)
+PREFETCH_NICENESS = 10
+
+_local = threading.local()
+
+
+def is_prefetching() -> bool:
+    """True on a thread that is running a prefetch job."""
+    return getattr(_local, "active", False)
+
+
+def _lower_priority() -> None:
+    # On Linux each thread has its own nice value; elsewhere this is a no-op
+    with contextlib.suppress(AttributeError, OSError):
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICENESS)
+
+
+class Prefetcher:
+    """
+    Warm preview caches for files near the cursor on low-priority threads.
+
+    `schedule` replaces whatever was queued before, so only the latest
+    cursor position is worked on. Jobs don't start while `busy()` is true
+    (a real preview is rendering), and a real render of a file that is
+    already being prefetched can `wait` for it instead of starting over.
+    """
+
+    def __init__(self, render: Callable[[Path], None],
+                 busy: Callable[[], bool] = lambda: False,
+                 workers: int | None = None):
+        self.render = render
+        self.busy = busy
+        workers = workers or max(1, min(4, (os.cpu_count() or 1) - 1))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch",
+                                        initializer=_lower_priority)
+        self._generation = 0
+        self._running: dict[Path, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, paths: list[Path]) -> None:
+        """Prefetch `paths` in order, dropping anything queued earlier."""
+        self._generation += 1
+        for path in paths:
+            self._pool.submit(self._run, self._generation, path)
+
+    def cancel(self) -> None:
+        self._generation += 1
+
+    def wait(self, path: Path, timeout: float | None = None) -> None:
+        """Block until an in-progress prefetch of `path` (if any) finishes."""
+        with self._lock:
+            done = self._running.get(path)
+        if done is not None:
+            done.wait(timeout)
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, generation: int, path: Path) -> None:
+        while self.busy():
+            if generation != self._generation:
+                return
+            time.sleep(0.05)
+        if generation != self._generation:
+            return
+        with self._lock:
+            if path in self._running:
+                return
+            done = self._running[path] = threading.Event()
+        _local.active = True
+        try:
+            self.render(path)
+        except Exception:
+            pass
+        finally:
+            _local.active = False
+            with self._lock:
+                del self._running[path]
+            done.set()
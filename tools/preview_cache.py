@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable
+
+from rich.markdown import Markdown
+from rich.syntax import Syntax
+from rich.text import Text
+
+# Rough per-segment cost of a rich_pixels renderable (Segment + Style)
+SEGMENT_COST = 256
+
+
+def estimate_size(renderable: Any) -> int:
+    """Approximate the memory held by a finished preview renderable, in bytes."""
+    if isinstance(renderable, str):
+        return sys.getsizeof(renderable)
+    if isinstance(renderable, Text):
+        return sys.getsizeof(renderable.plain) + 64 * len(renderable.spans)
+    if isinstance(renderable, Syntax):
+        return sys.getsizeof(renderable.code)
+    if isinstance(renderable, Markdown):
+        return sys.getsizeof(renderable.markup)
+    segments = getattr(renderable, "_segments", None)   # rich_pixels.Pixels
+    if segments is not None:
+        return SEGMENT_COST * len(getattr(segments, "segments", ()))
+    return sys.getsizeof(renderable)
+
+
+class PreviewCache:
+    """
+    LRU cache of finished preview renderables.
+
+    Entries are keyed by (path, mtime, size, preview width, preview
+    height, ...) so an edited file or a resized preview never hits a stale
+    entry. The least recently used entries are evicted once the estimated
+    total size goes over `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: Path, width: int, height: int, *extra: Hashable) -> tuple | None:
+        """Build a cache key for `path`, or None if it can't be stat'ed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (str(path), st.st_mtime_ns, st.st_size, width, height, *extra)
+
+    def get(self, key: Hashable | None) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key: Hashable | None) -> bool:
+        # Membership test for prefetching; doesn't count as a hit or refresh recency
+        return key is not None and key in self._entries
+
+    def put(self, key: Hashable | None, renderable: Any) -> None:
+        if key is None:
+            return
+        cost = estimate_size(renderable)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= old[1]
+            self._entries[key] = (renderable, cost)
+            self._total += cost
+            while self._total > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total -= evicted
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> str:
+        """One-line summary of occupancy and hit rate, for the status notification."""
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0.0
+        return (f"{len(self._entries)} previews, {self._total / 1e6:.1f}/"
+                f"{self.max_bytes / 1e6:.0f} MB, {self.hits} hits / "
+                f"{self.misses} misses ({rate:.0f}%), {self.evictions} evicted")
@@ -0,0 +1,188 @@
+import os
+from array import array
+from typing import Iterable
+
+from rich.text import Text
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+
+class ResultList(ScrollView, can_focus=True):
+    """
+    Virtualized list of search results: (score, path) rows from a filename
+    search, or (path, line, text) hits from a content search.
+
+    Results are held as flat arrays plus lists of strings; only the rows
+    currently on screen are turned into renderables, so memory and redraw
+    cost stay flat however many files match.
+    """
+
+    BINDINGS = [
+        Binding("up",       "cursor_up",   "Up",        show=False),
+        Binding("down",     "cursor_down", "Down",      show=False),
+        Binding("pageup",   "page_up",     "Page Up",   show=False),
+        Binding("pagedown", "page_down",   "Page Down", show=False),
+        Binding("home",     "first",       "First",     show=False),
+        Binding("end",      "last",        "Last",      show=False),
+        Binding("enter",    "select",      "Open",      show=False),
+    ]
+
+    COMPONENT_CLASSES = {"result-list--cursor", "result-list--dir", "result-list--score"}
+
+    DEFAULT_CSS = """
+    ResultList {
+        height: 1fr;
+        overflow-x: hidden;
+    }
+    ResultList > .result-list--cursor {
+        background: $accent;
+        color: $text;
+    }
+    ResultList > .result-list--dir {
+        color: $text-muted;
+    }
+    ResultList > .result-list--score {
+        color: $text-disabled;
+    }
+    """
+
+    cursor: reactive[int] = reactive(0, always_update=True)
+
+    class Selected(Message):
+        """Posted when a result is chosen with Enter or a click."""
+
+        def __init__(self, result_list: "ResultList", path: str, line: int | None = None) -> None:
+            super().__init__()
+            self.result_list = result_list
+            self.path = path
+            self.line = line
+
+        @property
+        def control(self) -> "ResultList":
+            return self.result_list
+
+    def __init__(self, *args, empty_message: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.empty_message = empty_message
+        self._scores = array("f")
+        self._paths: list[str] = []
+        # Content-search hits only: 1-based line numbers and line text
+        self._lines = array("L")
+        self._snippets: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def _reset(self) -> None:
+        self._scores = array("f")
+        self._paths = []
+        self._lines = array("L")
+        self._snippets = []
+        self.cursor = 0
+        self.scroll_to(0, 0, animate=False)
+
+    def _grown(self) -> None:
+        self.virtual_size = Size(0, len(self._paths))
+        self.refresh()
+
+    def set_results(self, rows: Iterable[tuple[float, str]]) -> None:
+        """Replace the list contents with (score, path) rows, best first."""
+        self._reset()
+        for score, path in rows:
+            self._scores.append(score)
+            self._paths.append(path)
+        self._grown()
+
+    def append_hits(self, hits: Iterable[tuple[str, int, str]]) -> None:
+        """Append (path, line, text) content-search hits."""
+        for path, line, text in hits:
+            self._paths.append(path)
+            self._lines.append(line)
+            self._snippets.append(text)
+        self._grown()
+
+    def clear(self) -> None:
+        self._reset()
+        self._grown()
+
+    @property
+    def highlighted_path(self) -> str | None:
+        if 0 <= self.cursor < len(self._paths):
+            return self._paths[self.cursor]
+        return None
+
+    def validate_cursor(self, cursor: int) -> int:
+        return max(0, min(cursor, len(self._paths) - 1))
+
+    def watch_cursor(self, cursor: int) -> None:
+        self.scroll_to_region(Region(0, cursor, 1, 1), animate=False)
+        self.refresh()
+
+    def action_cursor_up(self) -> None:
+        self.cursor -= 1
+
+    def action_cursor_down(self) -> None:
+        self.cursor += 1
+
+    def action_page_up(self) -> None:
+        self.cursor -= max(1, self.scrollable_content_region.height - 1)
+
+    def action_page_down(self) -> None:
+        self.cursor += max(1, self.scrollable_content_region.height - 1)
+
+    def action_first(self) -> None:
+        self.cursor = 0
+
+    def action_last(self) -> None:
+        self.cursor = len(self._paths) - 1
+
+    def action_select(self) -> None:
+        path = self.highlighted_path
+        if path is not None:
+            line = self._lines[self.cursor] if self._lines else None
+            self.post_message(self.Selected(self, path, line))
+
+    def on_click(self, event) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        row = self.scroll_offset.y + offset.y
+        if row < len(self._paths):
+            self.cursor = row
+            self.action_select()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        row = scroll_y + y
+        width = self.size.width
+        base = self.rich_style
+
+        if not self._paths:
+            if y == 0:
+                text = Text(self.empty_message, style=base + self.get_component_rich_style("result-list--dir"))
+                return Strip(text.render(self.app.console, end="")).crop_extend(0, width, base)
+            return Strip.blank(width, base)
+        if row >= len(self._paths):
+            return Strip.blank(width, base)
+
+        dirpath, fname = os.path.split(self._paths[row])
+        muted = self.get_component_rich_style("result-list--dir")
+        text = Text(no_wrap=True, overflow="ellipsis")
+        if self._lines:
+            text.append(f"{fname}:{self._lines[row]}", style=self.get_component_rich_style("result-list--score"))
+            text.append(f"  {self._snippets[row].strip()}")
+            text.append(f" — {dirpath}", style=muted)
+        else:
+            text.append(f"{self._scores[row]:3.0f} ", style=self.get_component_rich_style("result-list--score"))
+            text.append(fname)
+            text.append(f" — {dirpath}", style=muted)
+        line_style = base
+        if row == self.cursor:
+            line_style = base + self.get_component_rich_style("result-list--cursor")
+        text.stylize_before(line_style)
+        segments = list(text.render(self.app.console, end=""))
+        return Strip(segments).crop_extend(scroll_x, scroll_x + width, line_style)
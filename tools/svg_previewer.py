@@ -1,24 +1,94 @@
 from pathlib import Path
 from rich.console import RenderableType
 from PIL import Image
+from xml.etree import ElementTree
 import io
+import re
 try:
     import cairosvg
     CAIROSVG_AVAILABLE = True
-except ImportError:
+except (ImportError, OSError):   # OSError: cairocffi can't find libcairo
     CAIROSVG_AVAILABLE = False
 
+from .ascii_art import image_to_ascii
 from .image_previewer import ImagePreviewer
+from .thumbnail_cache import ThumbnailCache
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def intrinsic_size(data: bytes) -> tuple[float, float] | None:
+    """Width and height of the root <svg> element (viewBox first), or None if not declared."""
+    try:
+        _, root = next(ElementTree.iterparse(io.BytesIO(data), events=("start",)))
+    except Exception:
+        return None
+    viewbox = _NUMBER_RE.findall(root.get("viewBox", ""))
+    if len(viewbox) == 4:
+        width, height = float(viewbox[2]), float(viewbox[3])
+    else:
+        # Only the ratio matters, so units can be ignored (percentages can't)
+        dims = [root.get(name, "") for name in ("width", "height")]
+        if any("%" in dim for dim in dims):
+            return None
+        numbers = [_NUMBER_RE.match(dim.strip()) for dim in dims]
+        if not all(numbers):
+            return None
+        width, height = (float(number.group()) for number in numbers)
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def fit_size(size: tuple[float, float] | None, max_width: int, max_height: int) -> tuple[int, int] | None:
+    """The largest (width, height) with the proportions of `size` that fits the box."""
+    if size is None:
+        return None
+    scale = min(max_width / size[0], max_height / size[1])
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
 
 class SVGPreviewer:
     """
     Render SVG files by converting them to PNG and using the existing ImagePreviewer.
     Falls back to showing SVG source code if cairosvg is not available.
     """
-    def __init__(self, max_width: int = 1000, max_height: int = 1000):
+    def __init__(self, max_width: int = 1000, max_height: int = 1000,
+                 thumbnails: ThumbnailCache | None = None):
         self.max_width = max_width
         self.max_height = max_height
-        self.image_previewer = ImagePreviewer(max_width, max_height)
+        self.thumbnails = thumbnails
+        self.image_previewer = ImagePreviewer(max_width, max_height, thumbnails=thumbnails)
+        self._last: tuple[str | None, Image.Image] | None = None
+
+    def _rasterize(self, path: Path, width: int, height: int) -> Image.Image:
+        """
+        Render the SVG to fit (width x height), keeping its aspect ratio.
+
+        The last bitmap is kept so the pixel and ASCII previews of the same
+        file share one rasterization; the thumbnail cache covers the rest.
+        """
+        key = ThumbnailCache.key(path, "svg", width, height)
+        if key is not None and self._last is not None and self._last[0] == key:
+            return self._last[1]
+
+        def build() -> Image.Image:
+            data = path.read_bytes()
+            size = fit_size(intrinsic_size(data), width, height)
+            if size is None:
+                # Unknown proportions: let cairosvg derive the height, then shrink to fit
+                png_bytes = cairosvg.svg2png(bytestring=data, output_width=width)
+            else:
+                png_bytes = cairosvg.svg2png(bytestring=data, output_width=size[0],
+                                             output_height=size[1])
+            img = Image.open(io.BytesIO(png_bytes))
+            img.load()
+            img.thumbnail((width, height))
+            return img
+        if self.thumbnails is None:
+            img = build()
+        else:
+            img = self.thumbnails.image(path, ("svg", width, height), build)
+        self._last = (key, img)
+        return img
 
     def rich_preview(self, file_path: str) -> RenderableType:
         """
@@ -32,18 +102,7 @@ class SVGPreviewer:
             raise FileNotFoundError(f"SVG file not found: {file_path}")
 
         try:
-            # Read SVG content
-            svg_content = path.read_text(encoding="utf-8")
-            
-            # Convert SVG to PNG bytes
-            png_bytes = cairosvg.svg2png(
-                bytestring=svg_content.encode("utf-8"),
-                output_width=self.max_width,
-                output_height=self.max_height
-            )
-            
-            # Create PIL Image from PNG bytes
-            png_image = Image.open(io.BytesIO(png_bytes))
+            png_image = self._rasterize(path, self.max_width, self.max_height)
             
             # Use rich_pixels to display the PNG
             from rich_pixels import Pixels
@@ -62,35 +121,13 @@ class SVGPreviewer:
             
         try:
             path = Path(file_path)
-            svg_content = path.read_text(encoding="utf-8")
             
             # Use smaller dimensions for ASCII to keep it readable
             ascii_width = min(80, self.max_width // 10)
             ascii_height = min(40, self.max_height // 10)
             
-            png_bytes = cairosvg.svg2png(
-                bytestring=svg_content.encode("utf-8"),
-                output_width=ascii_width * 2, 
-                output_height=ascii_height * 2
-            )
-            
-            # Create ASCII art using ImagePreviewer
-            png_image = Image.open(io.BytesIO(png_bytes))
-            
-            # Convert to grayscale and create ASCII
-            img = png_image.convert("L")
-            img.thumbnail((ascii_width, ascii_height))
-            
-            ascii_chars = "@%#*+=-:. "
-            output = []
-            for y in range(img.height):
-                row = []
-                for x in range(img.width):
-                    pixel = img.getpixel((x, y))
-                    idx = pixel * (len(ascii_chars) - 1) // 255
-                    row.append(ascii_chars[idx])
-                output.append("".join(row))
-            return "\n".join(output)
+            png_image = self._rasterize(path, self.max_width, self.max_height)
+            return image_to_ascii(png_image, ascii_width, ascii_height)
             
         except Exception:
             return self.text_preview(file_path)
@@ -0,0 +1,176 @@
+import io
+import os
+import hashlib
+import tempfile
+import threading
+import contextlib
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image
+
+from .cache_dir import cache_path
+
+# Modes PNG stores losslessly; anything else is converted before saving
+PNG_MODES = {"1", "L", "LA", "P", "RGB", "RGBA"}
+
+
+class ThumbnailCache:
+    """
+    Persistent cache of scaled preview images and extracted text, shared
+    across sessions under ~/.cache/cli-file-explorer/thumbnails.
+
+    Entries are keyed by source path, mtime, size and the caller's render
+    parameters (target dimensions, page number, ...), so an edited file or
+    a different preview size never hits a stale entry. Each entry is one
+    file written atomically; a hit refreshes its mtime, and once the cache
+    grows past `max_bytes` the least recently used entries are deleted.
+    If the cache directory can't be created the cache is disabled: every
+    lookup misses and nothing is written.
+    """
+
+    def __init__(self, directory: Path | None = None, max_bytes: int = 256 * 1024 * 1024):
+        self.directory: Path | None
+        try:
+            self.directory = Path(directory) if directory else cache_path("thumbnails")
+        except OSError:
+            self.directory = None
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: int | None = None    # bytes on disk, counted lazily
+
+    @staticmethod
+    def key(path: str | Path, *params) -> str | None:
+        """Cache key for `path` rendered with `params`, or None if it can't be stat'ed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = "\0".join(map(str, (os.path.abspath(path), st.st_mtime_ns, st.st_size, *params)))
+        return hashlib.sha1(raw.encode("utf-8", "surrogateescape")).hexdigest()
+
+    def _entry(self, key: str, suffix: str) -> Path:
+        return self.directory / key[:2] / (key + suffix)
+
+    def _read(self, key: str | None, suffix: str) -> bytes | None:
+        if key is None or self.directory is None:
+            return None
+        entry = self._entry(key, suffix)
+        try:
+            data = entry.read_bytes()
+            os.utime(entry)
+        except OSError:
+            return None
+        return data
+
+    def _write(self, key: str | None, suffix: str, data: bytes) -> None:
+        if key is None or self.directory is None:
+            return
+        entry = self._entry(key, suffix)
+        tmp = None
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, entry)
+        except OSError:
+            if tmp is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp)
+            return
+        self._grew(len(data))
+
+    def get_image(self, key: str | None) -> Image.Image | None:
+        data = self._read(key, ".png")
+        if data is None:
+            return None
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except Exception:
+            return None
+        return img
+
+    def put_image(self, key: str | None, img: Image.Image) -> None:
+        if img.mode not in PNG_MODES:
+            img = img.convert("RGBA")
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", compress_level=1)
+        self._write(key, ".png", buf.getvalue())
+
+    def get_text(self, key: str | None) -> str | None:
+        data = self._read(key, ".txt")
+        return data.decode("utf-8", "replace") if data is not None else None
+
+    def put_text(self, key: str | None, text: str) -> None:
+        self._write(key, ".txt", text.encode("utf-8", "surrogateescape"))
+
+    def image(self, path: str | Path, params: tuple,
+              build: Callable[[], Image.Image]) -> Image.Image:
+        """Return the cached image for (path, params), calling `build` and storing it on a miss."""
+        key = self.key(path, *params)
+        img = self.get_image(key)
+        if img is None:
+            img = build()
+            self.put_image(key, img)
+        return img
+
+    def text(self, path: str | Path, params: tuple, build: Callable[[], str]) -> str:
+        """Like `image`, for extracted text."""
+        key = self.key(path, *params)
+        text = self.get_text(key)
+        if text is None:
+            text = build()
+            self.put_text(key, text)
+        return text
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        out = []
+        if self.directory is None:
+            return out
+        try:
+            subs = [sub for sub in self.directory.iterdir() if sub.is_dir()]
+        except OSError:
+            return out
+        for sub in subs:
+            try:
+                with os.scandir(sub) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        out.append((st.st_mtime, st.st_size, Path(entry.path)))
+            except OSError:
+                continue
+        return out
+
+    def _grew(self, nbytes: int) -> None:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += nbytes
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Drop to 90% of the cap so eviction doesn't run on every write
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 9 // 10
+        for _, size, path in entries:
+            if total <= target:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total -= size
+        self._total = total
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                with contextlib.suppress(OSError):
+                    path.unlink()
+            self._total = 0
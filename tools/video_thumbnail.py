@@ -1,65 +1,61 @@
 from pathlib import Path
-import subprocess
-import io
 from PIL import Image
 from rich_pixels import Pixels
 from rich.console import RenderableType
 
+from .ascii_art import DEFAULT_ASCII_CHARS, image_to_ascii
+from .frame_service import FrameService
+from .thumbnail_cache import ThumbnailCache
+
 class VideoThumbnailer:
     """
-    Extract the first frame of a video and render it
+    Extract a representative frame of a video and render it
     """
 
     def __init__(self,
                  max_width: int = 40,
                  max_height: int = 20,
-                 ascii_chars: str = "@%#*+=-:. "):
+                 ascii_chars: str = DEFAULT_ASCII_CHARS,
+                 thumbnails: ThumbnailCache | None = None,
+                 frames: FrameService | None = None,
+                 position: float = 0.1,
+                 filmstrip: int = 0):
         self.max_width = max_width
         self.max_height = max_height
         self.ascii_chars = ascii_chars
+        self.thumbnails = thumbnails
+        self.frames = frames or FrameService()
+        # Where to take the frame from, as a fraction of the duration
+        self.position = position
+        # Show this many evenly spaced frames in a grid instead (0 = off)
+        self.filmstrip = filmstrip
 
     def _get_frame(self, file_path: str) -> Image.Image:
         path = Path(file_path)
         if not path.exists() or not path.is_file():
             raise FileNotFoundError(f"Video not found: {file_path}")
-
-        # Use ffmpeg to pull out frame 0 as PNG bytes on stdout
-        cmd = [
-            "ffmpeg", "-v", "error",
-            "-ss", "0", "-i", str(path),
-            "-frames:v", "1",
-            "-f", "image2pipe", "-vcodec", "png", "pipe:1"
-        ]
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
-        data = proc.stdout.read()
-        proc.wait()
-
-        img = Image.open(io.BytesIO(data))
-        return img
+        if self.filmstrip > 1:
+            return self.frames.filmstrip(path, self.max_width, self.max_height, self.filmstrip)
+        return self.frames.grab(path, self.max_width, self.max_height, self.position)
+
+    def _thumbnail(self, file_path: str) -> Image.Image:
+        """The frame scaled to fit max dimensions, from the thumbnail cache when possible."""
+        # ffmpeg already scales the frame to fit
+        build = lambda: self._get_frame(file_path)
+        if self.thumbnails is None:
+            return build()
+        mode = ("filmstrip", self.filmstrip) if self.filmstrip > 1 else ("video", self.position)
+        return self.thumbnails.image(file_path, (*mode, self.max_width, self.max_height), build)
 
     def rich_preview(self, file_path: str) -> RenderableType:
         """
-        Returns a rich_pixels.Pixels object of the first frame,
+        Returns a rich_pixels.Pixels object of the frame,
         scaled to fit within (max_width, max_height).
         """
-        img = self._get_frame(file_path)
-        img.thumbnail((self.max_width, self.max_height))
-        return Pixels.from_image(img)
+        return Pixels.from_image(self._thumbnail(file_path))
 
     def ascii_preview(self, file_path: str) -> str:
         """
-        Converts the first frame to grayscale ASCII art.
+        Converts the frame to grayscale ASCII art.
         """
-        img = self._get_frame(file_path).convert("L")
-        img.thumbnail((self.max_width, self.max_height))
-
-        rows: list[str] = []
-        for y in range(img.height):
-            row_chars: list[str] = []
-            for x in range(img.width):
-                pixel = img.getpixel((x, y))
-                idx = pixel * (len(self.ascii_chars) - 1) // 255
-                row_chars.append(self.ascii_chars[idx])
-            rows.append("".join(row_chars))
-
-        return "\n".join(rows)
+        return image_to_ascii(self._thumbnail(file_path), self.max_width, self.max_height, self.ascii_chars)
@@ -1,11 +1,817 @@
+import os
+import time
+import asyncio
+from array import array
+from collections import Counter
+from functools import partial
 from pathlib import Path
+
+from rich.cells import cell_len
+from rich.style import Style
+from rich.syntax import Syntax
+from rich.text import Text
+from textual import work
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
 from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 from textual.widgets import DirectoryTree
+from textual.widgets.directory_tree import DirEntry
+from textual.widgets.tree import TreeNode, UnknownNodeID
+from textual.worker import get_current_worker
+
+from tools.dir_cache import DirCache
+from tools.dir_size import format_size
+from tools.dir_table import COLUMNS, KIND_DIR, DirTable
+from tools.fs_watcher import Change, DirectoryWatcher
+from tools.lazy_text import LazyTextFile
 
 class HideableDirectoryTree(DirectoryTree):
+    """
+    DirectoryTree with a hidden-files toggle that keeps itself in sync with
+    the disk: every loaded directory is watched, and entries created,
+    removed or renamed there (by this app or anything else) are patched
+    into the tree in place, keeping expansion state and the cursor.
+
+    Listings come from a `DirCache` (one `scandir` per directory, reused
+    while the directory's mtime is unchanged). Large directories are added
+    in chunks: the first screenful straight away, the rest between
+    repaints.
+    """
+
+    # More changes than this in one directory at once: re-list it instead
+    BULK_CHANGES = 256
+    # Nodes added per repaint while filling a large directory
+    FILL_CHUNK = 2000
+
     show_hidden: reactive[bool] = reactive(False)
 
-    def filter_paths(self, paths: list[Path]) -> list[Path]:
-        if self.show_hidden:
-            return paths
-        return [p for p in paths if not p.name.startswith(".")] 
\ No newline at end of file
+    def __init__(self, *args, **kwargs):
+        self._dir_nodes: dict[Path, TreeNode[DirEntry]] = {}
+        self.watcher = DirectoryWatcher(self._on_fs_change)
+        self.dir_cache = DirCache()
+        # Node id -> (fill generation, names still to be added)
+        self._filling: dict[int, tuple[int, set[str]]] = {}
+        self._fill_generation = 0
+        super().__init__(*args, **kwargs)
+
+    def on_mount(self) -> None:
+        self.watcher.start()
+
+    def on_unmount(self) -> None:
+        self.watcher.stop()
+
+    ## Loading directories ##
+    @staticmethod
+    def _listing_path(node: TreeNode[DirEntry]) -> str:
+        # Purely lexical, so cached listings can be looked up without touching the disk
+        return os.path.abspath(node.data.path.expanduser())
+
+    @work(thread=True, exit_on_error=False)
+    def _load_directory(self, node: TreeNode[DirEntry]) -> list[tuple[str, bool]]:
+        assert node.data is not None
+        listing = self.dir_cache.listing(self._listing_path(node))
+        return listing.entries(self.show_hidden) if listing is not None else []
+
+    def _add_to_load_queue(self, node: TreeNode[DirEntry]):
+        # Register when queued: the loader skips `_populate_node` for an empty directory
+        if node.data is not None and not node.data.loaded:
+            self._register(node)
+        return super()._add_to_load_queue(node)
+
+    def _register(self, node: TreeNode[DirEntry]) -> None:
+        self._dir_nodes[node.data.path] = node
+        self.watcher.watch(node.data.path)
+
+    def _populate_node(self, node: TreeNode[DirEntry], content: list[tuple[str, bool]]) -> None:
+        self._forget(node)
+        node.remove_children()
+        self._register(node)
+        first = max(100, self.size.height * 2)
+        self._add_entries(node, content[:first])
+        node.expand()
+        if len(content) <= first:
+            self._filling.pop(node.id, None)
+            return
+        self._fill_generation += 1
+        self._filling[node.id] = (self._fill_generation, {name for name, _ in content[first:]})
+        self.call_after_refresh(self._fill, node, content, first, self._fill_generation)
+
+    def _fill(self, node: TreeNode[DirEntry], content: list[tuple[str, bool]],
+              start: int, generation: int) -> None:
+        """Add the next chunk of a large directory, then wait for a repaint."""
+        filling = self._filling.get(node.id)
+        if filling is None or filling[0] != generation or self._dir_nodes.get(node.data.path) is not node:
+            return
+        pending = filling[1]
+        # Chunks grow with the node, so a huge directory isn't rebuilt line-by-line hundreds of times
+        end = start + max(self.FILL_CHUNK, start // 4)
+        # Skip anything the watcher saw removed in the meantime
+        self._add_entries(node, [entry for entry in content[start:end] if entry[0] in pending])
+        if end < len(content):
+            pending.difference_update(name for name, _ in content[start:end])
+            self.call_after_refresh(self._fill, node, content, end, generation)
+        else:
+            del self._filling[node.id]
+
+    def get_label_width(self, node: TreeNode[DirEntry]) -> int:
+        # What render_label would measure, without styling a Text per node on every rebuild
+        if node.allow_expand:
+            icon = self.ICON_NODE_EXPANDED if node.is_expanded else self.ICON_NODE
+        else:
+            icon = self.ICON_FILE
+        return cell_len(icon) + node.label.cell_len
+
+    def _add_entries(self, node: TreeNode[DirEntry], entries: list[tuple[str, bool]]) -> None:
+        """Append children with one tree invalidation, rather than one per `TreeNode.add`."""
+        node._children.extend(self._new_child(node, name, is_dir) for name, is_dir in entries)
+        node._updates += 1
+        self._invalidate()
+
+    def _new_child(self, node: TreeNode[DirEntry], name: str, is_dir: bool) -> TreeNode[DirEntry]:
+        """A node for `name` under `node`, not yet attached to its children."""
+        label = self.process_label(name) if "\n" in name else Text(name)
+        child = self._add_node(node, label, DirEntry(node.data.path / name))
+        child._allow_expand = is_dir
+        return child
+
+    ## Partial reloads ##
+    async def reload_dirs(self, *paths: Path) -> None:
+        """
+        Re-list only the loaded directories among `paths` and patch their
+        children in place. Unchanged nodes are kept, so expansion state,
+        scroll position and the cursor survive, unlike `reload()`.
+        """
+        nodes = {path: self._dir_nodes[path] for path in dict.fromkeys(Path(os.path.abspath(p)) for p in paths)
+                 if path in self._dir_nodes}
+        if not nodes:
+            return
+        # One `stat` per directory; only those changed since they were cached are listed again
+        listings = await asyncio.to_thread(
+            lambda: {path: self.dir_cache.listing(self._listing_path(node)) for path, node in nodes.items()})
+        self._sync_nodes({node: listings[path].entries(self.show_hidden) if listings[path] is not None else []
+                          # The node may have been replaced while the directory was listed
+                          for path, node in nodes.items() if self._dir_nodes.get(path) is node})
+
+    def watch_show_hidden(self) -> None:
+        """Re-filter the loaded directories from the cache, revalidated against the disk."""
+        self.run_worker(self.reload_dirs(*self._dir_nodes), group="show_hidden", exclusive=True)
+
+    def _sync_nodes(self, listings: dict[TreeNode[DirEntry], list[tuple[str, bool]]]) -> None:
+        """Make each node's children match its listing, reusing the nodes that are still there."""
+        if not listings:
+            return
+        cursor = self.cursor_node
+        row = cursor.line - self.scroll_offset.y if cursor is not None else 0
+        for node, entries in listings.items():
+            # Any chunked fill in progress is overtaken by the full listing
+            self._filling.pop(node.id, None)
+            existing = {child.data.path.name: child for child in node.children if child.data is not None}
+            children = []
+            for name, is_dir in entries:
+                child = existing.pop(name, None)
+                if child is None or child.allow_expand != is_dir:
+                    child = self._new_child(node, name, is_dir)
+                children.append(child)
+            for child in existing.values():
+                # Dropped with the old list below; TreeNode.remove() would search it for each one
+                self._forget(child, include_self=True)
+                child._remove_children()
+                del self._tree_nodes[child.id]
+            node._children = children
+            node._updates += 1
+        self._invalidate()
+        self._restore_cursor(cursor, row)
+
+    def _restore_cursor(self, cursor: TreeNode[DirEntry] | None, row: int) -> None:
+        """Put the cursor back on `cursor` (or its nearest surviving ancestor) at the same screen row."""
+        while cursor is not None:
+            try:
+                self.get_node_by_id(cursor.id)
+                break
+            except UnknownNodeID:
+                cursor = cursor.parent
+        if cursor is None:
+            return
+        _ = self._tree_lines
+        if cursor.line != self.cursor_line:
+            self.move_cursor(cursor, animate=False)
+        self.scroll_to(y=max(0, cursor.line - row), animate=False)
+
+    def select_path(self, path: Path) -> bool:
+        """Move the cursor to `path` if its directory is loaded; True if it was found."""
+        path = Path(os.path.abspath(path))
+        parent = self._dir_nodes.get(path.parent)
+        node = self._child(parent, path.name) if parent is not None else None
+        if node is None:
+            return False
+        _ = self._tree_lines
+        self.move_cursor(node, animate=False)
+        return True
+
+    ## Watching loaded directories ##
+    def clear_node(self, node: TreeNode[DirEntry]):
+        self._forget(node)
+        return super().clear_node(node)
+
+    def reset_node(self, node: TreeNode[DirEntry], label, data: DirEntry | None = None):
+        self._forget(node, include_self=True)
+        return super().reset_node(node, label, data)
+
+    def _forget(self, node: TreeNode[DirEntry], include_self: bool = False) -> None:
+        """Stop watching the directories under `node` (and `node` itself if asked)."""
+        stack = [node] if include_self else list(node.children)
+        while stack:
+            current = stack.pop()
+            if current.data is not None and self._dir_nodes.get(current.data.path) is current:
+                del self._dir_nodes[current.data.path]
+                self.watcher.unwatch(current.data.path)
+            stack.extend(current.children)
+
+    def _on_fs_change(self, changes: list[Change]) -> None:
+        # Watcher thread
+        try:
+            self.app.call_from_thread(self._apply_changes, changes)
+        except RuntimeError:
+            pass    # app is shutting down
+
+    def _apply_changes(self, changes: list[Change]) -> None:
+        cursor = self.cursor_node
+        per_dir = Counter(change.directory for change in changes)
+        reloading: set[str] = set()
+        # Directories renamed earlier in this batch; later events may still use the old path
+        moved: dict[str, str] = {}
+        for change in changes:
+            if moved:
+                change = change._replace(directory=self._moved_path(change.directory, moved),
+                                         new_directory=self._moved_path(change.new_directory, moved))
+            if change.kind == "rescan" or per_dir[change.directory] > self.BULK_CHANGES:
+                if change.directory not in reloading:
+                    reloading.add(change.directory)
+                    node = self._dir_nodes.get(Path(change.directory))
+                    if node is not None:
+                        self.reload_node(node)
+                continue
+            if change.kind == "created":
+                self._insert_entry(Path(change.directory), change.name, change.is_dir)
+                continue
+            parent = self._dir_nodes.get(Path(change.directory))
+            if parent is not None and parent.id in self._filling:
+                self._filling[parent.id][1].discard(change.name)
+            old = self._child(parent, change.name) if parent is not None else None
+            new = None
+            if change.kind == "renamed":
+                if change.is_dir:
+                    moved[os.path.join(change.directory, change.name)] = \
+                        os.path.join(change.new_directory, change.new_name)
+                new = self._insert_entry(Path(change.new_directory), change.new_name, change.is_dir, old)
+            if old is None:
+                continue
+            if cursor is not None and self._contains(old, cursor):
+                cursor = new if new is not None and cursor is old else old.parent
+            self._forget(old, include_self=True)
+            old.remove()
+        if cursor is not None:
+            _ = self._tree_lines
+            if cursor.line != self.cursor_line:
+                self.move_cursor(cursor, animate=False)
+
+    @staticmethod
+    def _moved_path(path: str, moved: dict[str, str]) -> str:
+        for old, new in moved.items():
+            if path == old or path.startswith(old + os.sep):
+                return new + path[len(old):]
+        return path
+
+    def _visible(self, name: str) -> bool:
+        return self.show_hidden or not name.startswith(".")
+
+    @staticmethod
+    def _child(parent: TreeNode[DirEntry], name: str) -> TreeNode[DirEntry] | None:
+        return next((c for c in parent.children if c.data is not None and c.data.path.name == name), None)
+
+    @staticmethod
+    def _sort_key(node: TreeNode[DirEntry]) -> tuple[bool, str]:
+        # Same order as DirectoryTree: directories first, then by name
+        return (not node.allow_expand, node.data.path.name.lower())
+
+    def _insert_entry(self, directory: Path, name: str, is_dir: bool,
+                      source: TreeNode[DirEntry] | None = None) -> TreeNode[DirEntry] | None:
+        """
+        Add `name` under its directory's node, in sorted position. When it
+        was renamed from `source`, a loaded directory keeps its subtree and
+        expansion state.
+        """
+        parent = self._dir_nodes.get(directory)
+        if parent is None or not self._visible(name) or self._child(parent, name) is not None:
+            return None
+        filling = self._filling.get(parent.id)
+        if filling is not None and name in filling[1]:
+            return None     # still to come from the listing
+        key = (not is_dir, name.lower())
+        before = next((c for c in parent.children if c.data is not None and self._sort_key(c) > key), None)
+        if source is None or not (source.allow_expand and source.data.loaded):
+            return parent.add(name, data=DirEntry(directory / name), before=before, allow_expand=is_dir)
+        node = parent.add(name, data=DirEntry(directory / name, loaded=True), before=before,
+                          expand=source.is_expanded)
+        self._copy_children(source, node)
+        return node
+
+    def _copy_children(self, source: TreeNode[DirEntry], target: TreeNode[DirEntry]) -> None:
+        self._register(target)
+        for child in source.children:
+            path = target.data.path / child.data.path.name
+            copy = target.add(child.label, data=DirEntry(path, child.data.loaded),
+                              expand=child.is_expanded, allow_expand=child.allow_expand)
+            if child.allow_expand and child.data.loaded:
+                self._copy_children(child, copy)
+
+    @staticmethod
+    def _contains(ancestor: TreeNode, node: TreeNode) -> bool:
+        while node is not None:
+            if node is ancestor:
+                return True
+            node = node.parent
+        return False
+
+
+class TextViewer(ScrollView, can_focus=True):
+    """
+    Scrollable, syntax-highlighted view of a text file of any size.
+
+    Backed by a LazyTextFile: only the lines on screen plus `LOOKAHEAD`
+    lines either side are read and highlighted. Scanning for line offsets
+    beyond a small per-frame budget continues on a worker thread, so
+    jumping far into a large file never blocks the UI.
+
+    With `follow` set the view behaves like `tail -f`: it re-anchors near
+    the end of the file, polls for appended bytes and keeps the last line
+    in view while the user hasn't scrolled away. A truncated or rotated
+    file is reopened from its new start.
+    """
+
+    COMPONENT_CLASSES = {"text-viewer--gutter", "text-viewer--highlight"}
+
+    DEFAULT_CSS = """
+    TextViewer > .text-viewer--gutter {
+        color: $text-disabled;
+    }
+    TextViewer > .text-viewer--highlight {
+        background: $accent 40%;
+    }
+    """
+
+    LOOKAHEAD = 100
+    # Bytes scanned for line offsets while rendering; the rest goes to a worker
+    SCAN_BUDGET = 1024 * 1024
+    # Follow mode: poll period and how much of the file's end to show
+    FOLLOW_INTERVAL = 0.5
+    TAIL_BYTES = 256 * 1024
+
+    follow: reactive[bool] = reactive(False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.document: LazyTextFile | None = None
+        self.highlight_line: int | None = None
+        self._syntax: Syntax | None = None
+        self._code_style = Style()
+        self._window_start = 0
+        self._window: list[Text] = []
+        self._wanted = 0
+        self._max_width = 0
+        self._follow_timer = None
+
+    def load(self, path: str, lexer: str | None = None, line: int | None = None) -> None:
+        """Show `path`, highlighting and scrolling to 1-based `line` if given."""
+        doc = self.document
+        if doc is not None and doc.path == path and self.follow and line is None:
+            return
+        if (doc is None or doc.path != path or line != self.highlight_line
+                or doc.mtime_ns != os.stat(path).st_mtime_ns):
+            self.follow = False
+            self._open(path)
+            self._syntax = Syntax("", lexer) if lexer else None
+            # Theme background, so code lines are filled edge to edge
+            self._code_style = self._syntax.highlight("").style if lexer else Style()
+            self.highlight_line = line
+        self._invalidate()
+        if line:
+            self._wanted = line + self.LOOKAHEAD
+            self._index()
+            self.call_after_refresh(self.scroll_to, y=max(0, line - 3), animate=False)
+
+    def _open(self, path: str, tail: bool = False) -> None:
+        self.close()
+        self.document = LazyTextFile(path)
+        if tail:
+            self.document.tail(self.TAIL_BYTES)
+        self._wanted = 0
+        self._max_width = 0
+        self.scroll_to(0, 0, animate=False)
+
+    def close(self) -> None:
+        if self.document is not None:
+            self.workers.cancel_group(self, "text-index")
+            self.document.close()
+            self.document = None
+        self._invalidate()
+
+    def watch_follow(self, follow: bool) -> None:
+        if self._follow_timer is not None:
+            self._follow_timer.stop()
+            self._follow_timer = None
+        doc = self.document
+        if not follow or doc is None:
+            return
+        if not doc.complete and doc.size - doc.start > self.TAIL_BYTES:
+            # Don't index a huge file from the top just to reach its end
+            self._open(doc.path, tail=True)
+        self._poll(scroll=True)
+        self._follow_timer = self.set_interval(self.FOLLOW_INTERVAL, self._poll)
+
+    def _poll(self, scroll: bool = False) -> None:
+        """Follow mode: pick up appended lines, reopening a truncated or rotated file."""
+        doc = self.document
+        if doc is None:
+            return
+        scroll = scroll or self.scroll_offset.y >= self.max_scroll_y
+        change = doc.refresh()
+        if change == "replaced":
+            self._open(doc.path, tail=True)
+            doc = self.document
+        elif not change and doc.complete:
+            return
+        # Appended data is scanned a bounded slice per tick
+        doc.index_to(doc.indexed_lines + 1_000_000, self.SCAN_BUDGET * 8)
+        self._invalidate()
+        if scroll:
+            self.call_after_refresh(self.scroll_end, animate=False)
+
+    def on_unmount(self) -> None:
+        self.close()
+
+    def _invalidate(self) -> None:
+        self._window = []
+        self._update_size()
+
+    def _update_size(self) -> None:
+        doc = self.document
+        lines = doc.line_count if doc is not None else 0
+        size = Size(self._gutter_width() + self._max_width, lines)
+        if size != self.virtual_size:
+            self.virtual_size = size
+        self.refresh()
+
+    def _gutter_width(self) -> int:
+        doc = self.document
+        if doc is None or doc.start:
+            # Anchored at the tail: absolute line numbers aren't known
+            return 0
+        return len(str(doc.line_count)) + 1
+
+    def _index(self) -> None:
+        """Index up to `_wanted` within budget, handing the remainder to a worker."""
+        doc = self.document
+        if doc is None or doc.index_to(self._wanted, self.SCAN_BUDGET):
+            return
+        self.run_worker(partial(self._index_worker, doc, self._wanted), thread=True,
+                        exclusive=True, group="text-index")
+
+    def _index_worker(self, doc: LazyTextFile, line: int) -> None:
+        worker = get_current_worker()
+        done = False
+        while not done and not worker.is_cancelled:
+            done = doc.index_to(line, self.SCAN_BUDGET * 8)
+            self.app.call_from_thread(self._indexed, doc)
+
+    def _indexed(self, doc: LazyTextFile) -> None:
+        if doc is self.document:
+            self._window = []
+            self._update_size()
+
+    def _load_window(self, row: int) -> None:
+        doc = self.document
+        start = max(0, row - self.LOOKAHEAD)
+        count = self.size.height + 2 * self.LOOKAHEAD
+        lines = doc.lines(start, count)
+        if self._syntax is not None and lines:
+            window = list(self._syntax.highlight("\n".join(lines)).split("\n"))
+            window += [Text() for _ in range(len(lines) - len(window))]
+        else:
+            window = [Text(line) for line in lines]
+        for text in window:
+            text.expand_tabs(4)
+            text.no_wrap = True
+            self._max_width = max(self._max_width, text.cell_len)
+        self._window_start, self._window = start, window
+        self._update_size()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        row = scroll_y + y
+        width = self.size.width
+        base = self.rich_style
+        doc = self.document
+        if doc is None:
+            return Strip.blank(width, base)
+
+        if row >= doc.indexed_lines and not doc.complete:
+            self._wanted = max(self._wanted, row + self.size.height + self.LOOKAHEAD)
+            self._index()
+        if not self._window_start <= row < self._window_start + len(self._window):
+            if row >= doc.indexed_lines:
+                return Strip.blank(width, base)
+            self._load_window(row)
+        index = row - self._window_start
+        if index >= len(self._window):
+            return Strip.blank(width, base)
+
+        gutter_width = self._gutter_width()
+        base = base + self._code_style
+        line_style = base
+        if self.highlight_line == row + 1:
+            line_style = base + self.get_component_rich_style("text-viewer--highlight")
+        text = self._window[index].copy()
+        text.stylize_before(line_style)
+        segments = list(text.render(self.app.console, end=""))
+        body = Strip(segments).crop_extend(scroll_x, scroll_x + width - gutter_width, line_style)
+        if not gutter_width:
+            return body
+        gutter = Text(f"{row + 1:>{gutter_width - 1}} ",
+                      style=base + self.get_component_rich_style("text-viewer--gutter"))
+        return Strip.join([Strip(gutter.render(self.app.console, end="")), body])
+
+
+class DirectoryTable(ScrollView, can_focus=True):
+    """
+    Virtualized detail view of one directory: name, size, modified time,
+    permissions and type, sortable by any column and filterable by name.
+
+    Backed by a DirTable, so the listing is a few flat columns and sorting
+    or filtering only swaps the array of row indices being shown; just the
+    rows on screen are formatted. The header row stays in place while the
+    rows scroll underneath it.
+    """
+
+    BINDINGS = [
+        Binding("up",       "cursor_up",    "Up",        show=False),
+        Binding("down",     "cursor_down",  "Down",      show=False),
+        Binding("pageup",   "page_up",      "Page Up",   show=False),
+        Binding("pagedown", "page_down",    "Page Down", show=False),
+        Binding("home",     "first",        "First",     show=False),
+        Binding("end",      "last",         "Last",      show=False),
+        Binding("enter",    "select",       "Open",      show=False),
+        Binding("s",        "cycle_sort",   "Sort By"),
+        Binding("r",        "reverse_sort", "Reverse"),
+    ]
+
+    COMPONENT_CLASSES = {"directory-table--header", "directory-table--cursor",
+                         "directory-table--dir", "directory-table--dim"}
+
+    DEFAULT_CSS = """
+    DirectoryTable {
+        height: 1fr;
+        overflow-x: hidden;
+    }
+    DirectoryTable > .directory-table--header {
+        text-style: bold;
+        background: $panel;
+    }
+    DirectoryTable > .directory-table--cursor {
+        background: $accent;
+        color: $text;
+    }
+    DirectoryTable > .directory-table--dir {
+        text-style: bold;
+    }
+    DirectoryTable > .directory-table--dim {
+        color: $text-muted;
+    }
+    """
+
+    # (column, title, width); the name column takes whatever is left
+    LAYOUT = [("size", "Size", 9), ("modified", "Modified", 16), ("perms", "Perms", 10), ("type", "Type", 6)]
+    MIN_NAME_WIDTH = 12
+
+    cursor: reactive[int] = reactive(0, always_update=True)
+    sort_column: reactive[str] = reactive("name", init=False)
+    sort_reverse: reactive[bool] = reactive(False, init=False)
+
+    class Selected(Message):
+        """Posted when an entry is chosen with Enter or a click."""
+
+        def __init__(self, directory_table: "DirectoryTable", path: Path, is_dir: bool) -> None:
+            super().__init__()
+            self.directory_table = directory_table
+            self.path = path
+            self.is_dir = is_dir
+
+        @property
+        def control(self) -> "DirectoryTable":
+            return self.directory_table
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.table: DirTable | None = None
+        self.message = ""
+        self._needle = ""
+        self._order = array("l")
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def set_table(self, table: DirTable | None, message: str = "") -> None:
+        """Show `table` (or just `message` while there is none), keeping the sort and filter."""
+        self.table = table
+        self.message = message
+        self._reorder(keep_row=False)
+        self.scroll_to(0, 0, animate=False)
+
+    def set_filter(self, needle: str) -> None:
+        """Only show names containing `needle` (case-insensitive)."""
+        if needle != self._needle:
+            self._needle = needle
+            self._reorder()
+
+    def watch_sort_column(self) -> None:
+        self._reorder()
+
+    def watch_sort_reverse(self) -> None:
+        self._reorder()
+
+    def _reorder(self, keep_row: bool = True) -> None:
+        """
+        Recompute the rows shown. Filtering a large table takes a full
+        pass over the names, so with a filter set the order is computed on
+        a worker and swapped in when ready.
+        """
+        table = self.table
+        if table is None or not self._needle:
+            order = table.order(self.sort_column, self.sort_reverse) if table else array("l")
+            self._set_order(table, self.sort_column, self.sort_reverse, self._needle, order, keep_row)
+            return
+        if not keep_row:
+            # The rows shown belong to the previous table
+            self._set_order(table, self.sort_column, self.sort_reverse, self._needle, array("l"), False)
+        self.run_worker(partial(self._order_worker, table, self.sort_column, self.sort_reverse,
+                                self._needle, keep_row),
+                        thread=True, exclusive=True, group="table-order", exit_on_error=False)
+
+    def _order_worker(self, table: DirTable, column: str, reverse: bool,
+                      needle: str, keep_row: bool) -> None:
+        order = table.order(column, reverse, needle)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._set_order, table, column, reverse, needle, order, keep_row)
+
+    def _set_order(self, table: DirTable | None, column: str, reverse: bool,
+                   needle: str, order: array, keep_row: bool) -> None:
+        if (table, column, reverse, needle) != (self.table, self.sort_column, self.sort_reverse, self._needle):
+            return      # superseded while it was being computed
+        current = self.highlighted_row if keep_row else None
+        self._order = order
+        self.virtual_size = Size(0, len(self._order) + 1)
+        # Follow the highlighted entry to its new position
+        try:
+            self.cursor = self._order.index(current) if current is not None else 0
+        except ValueError:
+            self.cursor = 0
+        self.refresh()
+
+    @property
+    def highlighted_row(self) -> int | None:
+        if 0 <= self.cursor < len(self._order):
+            return self._order[self.cursor]
+        return None
+
+    @property
+    def highlighted_path(self) -> Path | None:
+        row = self.highlighted_row
+        if row is None:
+            return None
+        return Path(self.table.path, self.table.names[row])
+
+    def validate_cursor(self, cursor: int) -> int:
+        return max(0, min(cursor, len(self._order) - 1))
+
+    def watch_cursor(self, cursor: int) -> None:
+        # Two lines, so the row also clears the header
+        self.scroll_to_region(Region(0, cursor, 1, 2), animate=False)
+        self.refresh()
+
+    def action_cursor_up(self) -> None:
+        self.cursor -= 1
+
+    def action_cursor_down(self) -> None:
+        self.cursor += 1
+
+    def action_page_up(self) -> None:
+        self.cursor -= max(1, self.scrollable_content_region.height - 2)
+
+    def action_page_down(self) -> None:
+        self.cursor += max(1, self.scrollable_content_region.height - 2)
+
+    def action_first(self) -> None:
+        self.cursor = 0
+
+    def action_last(self) -> None:
+        self.cursor = len(self._order) - 1
+
+    def action_cycle_sort(self) -> None:
+        index = COLUMNS.index(self.sort_column)
+        self.sort_column = COLUMNS[(index + 1) % len(COLUMNS)]
+
+    def action_reverse_sort(self) -> None:
+        self.sort_reverse = not self.sort_reverse
+
+    def action_select(self) -> None:
+        row = self.highlighted_row
+        if row is not None:
+            self.post_message(self.Selected(self, self.highlighted_path, self.table.kinds[row] == KIND_DIR))
+
+    def on_click(self, event) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        if offset.y == 0:
+            # Clicking a heading sorts by it, or flips the order if it already does
+            column = self._column_at(offset.x)
+            if column == self.sort_column:
+                self.sort_reverse = not self.sort_reverse
+            else:
+                self.sort_column = column
+            return
+        row = self.scroll_offset.y + offset.y - 1
+        if row < len(self._order):
+            self.cursor = row
+            self.action_select()
+
+    def _columns(self) -> list[tuple[str, str, int]]:
+        fixed = sum(width + 1 for _, _, width in self.LAYOUT)
+        name_width = max(self.MIN_NAME_WIDTH, self.size.width - fixed)
+        return [("name", "Name", name_width), *self.LAYOUT]
+
+    def _column_at(self, x: int) -> str:
+        for column, _, width in self._columns():
+            if x < width + 1:
+                return column
+            x -= width + 1
+        return self.LAYOUT[-1][0]
+
+    def _cells(self, row: int) -> list[str]:
+        table = self.table
+        kind = table.kinds[row]
+        return [
+            table.names[row] + ("/" if kind == KIND_DIR else ""),
+            "" if kind == KIND_DIR else format_size(table.sizes[row]),
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(table.mtimes[row])),
+            table.perms(row),
+            table.type_of(row),
+        ]
+
+    def _render_cells(self, cells: list[str], style: Style) -> Text:
+        text = Text(no_wrap=True, style=style)
+        for (column, _, width), cell in zip(self._columns(), cells):
+            cell_text = Text(cell)
+            cell_text.truncate(width, overflow="ellipsis")
+            if column == "size":
+                cell_text.pad_left(width - cell_text.cell_len)
+            else:
+                cell_text.pad_right(width - cell_text.cell_len)
+            text.append_text(cell_text)
+            text.append(" ")
+        return text
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        base = self.rich_style
+
+        if y == 0:
+            style = base + self.get_component_rich_style("directory-table--header")
+            titles = [title + ((" ▼" if self.sort_reverse else " ▲") if column == self.sort_column else "")
+                      for column, title, _ in self._columns()]
+            text = self._render_cells(titles, style)
+            return Strip(text.render(self.app.console, end="")).crop_extend(0, width, style)
+
+        row = scroll_y + y - 1
+        if not self._order:
+            if y == 1:
+                message = self.message or ("No names match" if self._needle else "Empty folder")
+                text = Text(message, style=base + self.get_component_rich_style("directory-table--dim"))
+                return Strip(text.render(self.app.console, end="")).crop_extend(0, width, base)
+            return Strip.blank(width, base)
+        if row >= len(self._order):
+            return Strip.blank(width, base)
+
+        index = self._order[row]
+        line_style = base
+        if self.table.kinds[index] == KIND_DIR:
+            line_style = line_style + self.get_component_rich_style("directory-table--dir")
+        if row == self.cursor:
+            line_style = line_style + self.get_component_rich_style("directory-table--cursor")
+        text = self._render_cells(self._cells(index), line_style)
+        segments = list(text.render(self.app.console, end=""))
+        return Strip(segments).crop_extend(scroll_x, scroll_x + width, line_style)